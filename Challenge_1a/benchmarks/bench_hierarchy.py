@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Micro-benchmark - Heading hierarchy assignment scaling
+
+Times OutlineExtractor._process_heading_hierarchy on synthetic documents
+with up to 10k+ heading candidates and many distinct font sizes, next to
+the previous incremental font-size mapping (which re-sorted the known
+sizes for every heading), to show that level assignment now scales
+linearithmically.
+
+Usage: python benchmarks/bench_hierarchy.py [--sizes 1000,10000] [--seed N]
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Any
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from outline_extractor import OutlineExtractor
+
+
+def make_headings(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Generate synthetic heading candidates with mostly distinct sizes."""
+    headings = []
+    for i in range(count):
+        heading = {
+            'text': f"Section heading {i}",
+            'confidence': rng.uniform(1.0, 3.5),
+            'page': i // 5 + 1
+        }
+        # Pattern-matched candidates carry no font size
+        if rng.random() < 0.8:
+            heading['font_size'] = round(rng.uniform(10.0, 36.0), 3)
+        headings.append(heading)
+    return headings
+
+
+def incremental_process_heading_hierarchy(headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reference: the previous order-dependent incremental size mapping."""
+    sorted_headings = sorted(headings, key=lambda x: (
+        x.get('confidence', 0), x.get('font_size', 0)), reverse=True)
+    processed = []
+    font_size_to_level = {}
+
+    for heading in sorted_headings:
+        text = heading['text']
+        font_size = heading.get('font_size', 12)
+        if re.match(r'^\d+\.\s+', text):
+            level = 'H1'
+        elif re.match(r'^\d+\.\d+\s+', text):
+            level = 'H2'
+        elif re.match(r'^\d+\.\d+\.\d+\s+', text):
+            level = 'H3'
+        elif font_size in font_size_to_level:
+            level = font_size_to_level[font_size]
+        else:
+            existing_sizes = sorted(font_size_to_level.keys(), reverse=True)
+            if not existing_sizes:
+                level = 'H1'
+            elif font_size > existing_sizes[0]:
+                new_mapping = {font_size: 'H1'}
+                for size in existing_sizes:
+                    new_mapping[size] = 'H2' if font_size_to_level[size] == 'H1' else 'H3'
+                font_size_to_level.update(new_mapping)
+                level = 'H1'
+            elif len(existing_sizes) == 1:
+                level = 'H2'
+            else:
+                level = 'H3'
+            font_size_to_level[font_size] = level
+        processed.append({'level': level, 'text': text, 'page': heading['page']})
+
+    processed.sort(key=lambda x: x['page'])
+    return processed
+
+
+def time_call(func, headings: List[Dict[str, Any]]) -> float:
+    """Return the wall time of one call in seconds."""
+    start_time = time.perf_counter()
+    func(headings)
+    return time.perf_counter() - start_time
+
+
+def main():
+    """Run the hierarchy scaling benchmark."""
+    parser = argparse.ArgumentParser(description="Heading hierarchy scaling benchmark")
+    parser.add_argument("--sizes", default="1000,2500,5000,10000",
+                        help="Comma-separated heading counts")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    extractor = OutlineExtractor()
+    rng = random.Random(args.seed)
+
+    print(f"{'headings':>9} {'incremental':>12} {'clustered':>10} {'clustered us/(n log2 n)':>24}")
+    for count in (int(size) for size in args.sizes.split(',')):
+        headings = make_headings(count, rng)
+        incremental = time_call(incremental_process_heading_hierarchy, headings)
+        clustered = time_call(extractor._process_heading_hierarchy, headings)
+        normalized = clustered * 1e6 / (count * math.log2(count))
+        print(f"{count:>9} {incremental:>11.3f}s {clustered:>9.3f}s {normalized:>24.3f}")
+
+
+if __name__ == "__main__":
+    main()
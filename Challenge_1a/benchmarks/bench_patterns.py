@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Micro-benchmark - Heading pattern matching throughput
+
+Compares the original sequential re.match loop over
+OutlineExtractor.heading_patterns with the precompiled combined pattern
+used by OutlineExtractor._extract_by_patterns, on the text lines of the
+bundled input PDFs.
+
+Usage: python benchmarks/bench_patterns.py [--input-dir DIR] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import fitz  # PyMuPDF
+from outline_extractor import OutlineExtractor
+from pdf_processor import PDFProcessor
+
+
+def load_page_texts(input_dir: Path) -> List[str]:
+    """Return the plain text of every page of every PDF in input_dir."""
+    processor = PDFProcessor()
+    page_texts = []
+    for pdf_file in sorted(input_dir.glob("*.pdf")):
+        with fitz.open(pdf_file) as doc:
+            for page_num in range(len(doc)):
+                page_content = processor._extract_page_content(doc[page_num], page_num + 1)
+                page_texts.append(page_content['plain_text'])
+    return page_texts
+
+
+def sequential_extract_by_patterns(patterns: List[str], plain_text: str) -> List[Dict[str, Any]]:
+    """Reference implementation: one re.match call per pattern per line."""
+    candidates = []
+    for line in plain_text.split('\n'):
+        line = line.strip()
+        if not line or len(line) < 3:
+            continue
+        for pattern in patterns:
+            match = re.match(pattern, line)
+            if match:
+                if match.groups():
+                    heading_text = match.group(1).strip()
+                else:
+                    heading_text = line.strip()
+                if heading_text and len(heading_text) >= 3:
+                    confidence = 1.0
+                    if any(char.isdigit() for char in line[:10]):
+                        confidence += 0.5
+                    candidates.append({
+                        'text': heading_text,
+                        'confidence': confidence,
+                        'pattern': pattern,
+                        'method': 'pattern_matching'
+                    })
+                break
+    return candidates
+
+
+def time_lines_per_second(func, page_texts: List[str], line_count: int, repeat: int) -> float:
+    """Run func over all pages repeat times and return lines per second."""
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for plain_text in page_texts:
+            func(plain_text)
+    elapsed = time.perf_counter() - start_time
+    return line_count * repeat / elapsed
+
+
+def main():
+    """Run the pattern matching benchmark."""
+    parser = argparse.ArgumentParser(description="Heading pattern matching benchmark")
+    parser.add_argument("--input-dir", type=Path,
+                        default=Path(os.path.dirname(__file__)) / '..' / 'input')
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    page_texts = load_page_texts(args.input_dir)
+    line_count = sum(text.count('\n') + 1 for text in page_texts)
+    if not line_count:
+        print("No text found in input PDFs.")
+        return
+
+    extractor = OutlineExtractor()
+    patterns = extractor.heading_patterns
+
+    # Both implementations must find exactly the same candidates
+    for plain_text in page_texts:
+        expected = sequential_extract_by_patterns(patterns, plain_text)
+        if extractor._extract_by_patterns(plain_text) != expected:
+            print("✗ Combined pattern results differ from sequential matching")
+            sys.exit(1)
+
+    sequential = time_lines_per_second(
+        lambda text: sequential_extract_by_patterns(patterns, text), page_texts, line_count, args.repeat)
+    combined = time_lines_per_second(
+        extractor._extract_by_patterns, page_texts, line_count, args.repeat)
+
+    print(f"Pages: {len(page_texts)}, lines: {line_count}, repeat: {args.repeat}")
+    print(f"  sequential re.match: {sequential:12,.0f} lines/sec")
+    print(f"  combined pattern:    {combined:12,.0f} lines/sec")
+    print(f"  speedup:             {combined / sequential:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Pipeline benchmark - End-to-end outline extraction across document shapes
+
+Runs PDFProcessor.extract_outline on the synthetic documents from
+synthetic_pdfs.py (many pages, many spans, dense tables, multi-column)
+and on the bundled input/ PDFs. Each document is measured in a fresh
+child process, so the reported peak RSS belongs to that document alone.
+Reports pages/second, peak RSS and per-stage timings, and can save a
+baseline and flag regressions against it.
+
+Usage: python benchmarks/bench_pipeline.py [--scale N] [--repeat N]
+                                           [--save-baseline FILE]
+                                           [--baseline FILE] [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'src'))
+
+from instrumentation import STAGES
+
+
+def run_child(pdf_path: Path, repeat: int) -> Dict[str, Any]:
+    """Extract one PDF ``repeat`` times in this process and report the best run."""
+    from pdf_processor import PDFProcessor
+
+    processor = PDFProcessor(collect_metrics=True)
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            result = processor.extract_outline(pdf_path)
+            seconds = time.perf_counter() - start_time
+        if best is None or seconds < best['seconds']:
+            best = {
+                'seconds': seconds,
+                'headings': len(result['outline']),
+                'metrics': processor.metrics.to_dict()
+            }
+
+    # ru_maxrss is in kilobytes on Linux
+    best['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return best
+
+
+def measure(pdf_path: Path, repeat: int) -> Dict[str, Any]:
+    """Measure one PDF in a fresh child process."""
+    completed = subprocess.run(
+        [sys.executable, __file__, '--child', str(pdf_path), '--repeat', str(repeat)],
+        capture_output=True, text=True, check=True
+    )
+    record = json.loads(completed.stdout.strip().splitlines()[-1])
+    pages = record['metrics']['counters'].get('pages', 0)
+    record['pages'] = pages
+    record['pages_per_sec'] = pages / record['seconds'] if record['seconds'] > 0 else 0.0
+    return record
+
+
+def print_report(records: Dict[str, Dict[str, Any]]) -> None:
+    """Print one row per document with throughput, memory and stage timings."""
+    stage_header = ' '.join(f"{stage:>13}" for stage in STAGES[:-1])
+    print(f"{'document':<28} {'pages':>5} {'seconds':>8} {'pages/s':>8} {'RSS MB':>7} "
+          f"{'headings':>8} {stage_header}")
+    for name, record in records.items():
+        stages = record['metrics']['stages']
+        stage_cells = ' '.join(f"{stages.get(stage, 0.0) * 1000:>11.1f}ms" for stage in STAGES[:-1])
+        print(f"{name[:28]:<28} {record['pages']:>5} {record['seconds']:>8.3f} "
+              f"{record['pages_per_sec']:>8.1f} {record['peak_rss_mb']:>7.1f} "
+              f"{record['headings']:>8} {stage_cells}")
+
+
+def check_regressions(records: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                      tolerance: float) -> List[str]:
+    """
+    Compare throughput and peak RSS against a saved baseline.
+
+    Args:
+        records: Current measurements by document name
+        baseline: Saved measurements by document name
+        tolerance: Allowed relative slowdown / memory growth (0.25 = 25%)
+
+    Returns:
+        List of regression messages (empty if none)
+    """
+    regressions = []
+    for name, record in records.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if record['pages_per_sec'] < reference['pages_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: {record['pages_per_sec']:.1f} pages/s "
+                               f"(baseline {reference['pages_per_sec']:.1f})")
+        if record['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {record['peak_rss_mb']:.1f} MB "
+                               f"(baseline {reference['peak_rss_mb']:.1f} MB)")
+        if record['headings'] != reference.get('headings', record['headings']):
+            regressions.append(f"{name}: {record['headings']} headings "
+                               f"(baseline {reference['headings']})")
+    return regressions
+
+
+def main():
+    """Run the pipeline benchmark."""
+    parser = argparse.ArgumentParser(description="End-to-end outline extraction benchmark")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Page count multiplier for the synthetic documents")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per document; the fastest is reported")
+    parser.add_argument("--data-dir", type=Path, default=BENCH_DIR / ".data",
+                        help="Where synthetic PDFs are generated (default: benchmarks/.data)")
+    parser.add_argument("--input-dir", type=Path, default=BENCH_DIR.parent / "input",
+                        help="Bundled PDFs to include (default: input/)")
+    parser.add_argument("--save-baseline", type=Path, default=None,
+                        help="Write the measurements to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="Compare against this JSON file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown or RSS growth (default: 0.25)")
+    parser.add_argument("--child", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.repeat)))
+        return
+
+    from synthetic_pdfs import generate
+
+    documents = {name: path for name, path in generate(args.data_dir, args.scale).items()}
+    for pdf_path in sorted(args.input_dir.glob("*.pdf")):
+        documents[f"input/{pdf_path.name}"] = pdf_path
+
+    records = {name: measure(pdf_path, args.repeat) for name, pdf_path in documents.items()}
+    print_report(records)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = check_regressions(records, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
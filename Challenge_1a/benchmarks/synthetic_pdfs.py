@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Synthetic PDFs - Deterministic benchmark documents of different shapes
+
+Generates PDFs with PyMuPDF that stress different parts of the pipeline:
+
+- many_pages:   long document with a few headings and paragraphs per page
+- many_spans:   every word in its own span (font size/weight changes)
+- dense_tables: pages filled with small table cells
+- multi_column: three-column article layout with numbered headings
+
+Usage: python benchmarks/synthetic_pdfs.py [--output-dir DIR] [--scale N]
+"""
+
+import argparse
+import random
+import textwrap
+from pathlib import Path
+from typing import Callable, Dict
+
+import fitz  # PyMuPDF
+
+PAGE_WIDTH, PAGE_HEIGHT = fitz.paper_size("a4")
+MARGIN = 50
+
+WORDS = ("data system process result method analysis model value table report "
+         "performance document section figure review design test sample "
+         "structure summary").split()
+
+
+class _Canvas:
+    """
+    Collects text and rectangle operators for one page as a raw content stream.
+
+    Writing the stream directly is orders of magnitude faster than one
+    insert_text/TextWriter call per span, which matters for the span- and
+    cell-heavy shapes.
+    """
+
+    def __init__(self):
+        self.ops = []
+
+    def text(self, x: float, y: float, text: str, size: float, bold: bool = False) -> None:
+        """Draw text with its baseline at (x, y), y measured from the top."""
+        escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+        font = 'hebo' if bold else 'helv'
+        self.ops.append(f"BT /{font} {size:g} Tf {x:.2f} {PAGE_HEIGHT - y:.2f} Td ({escaped}) Tj ET")
+
+    def paragraph(self, x: float, y: float, text: str, size: float, width: float,
+                  max_lines: int) -> float:
+        """Draw text wrapped to ``width`` points; return the y below the last line."""
+        chars_per_line = max(int(width / (size * 0.5)), 10)
+        for line in textwrap.wrap(text, chars_per_line)[:max_lines]:
+            self.text(x, y, line, size)
+            y += size * 1.2
+        return y
+
+    def rect(self, x: float, y: float, width: float, height: float) -> None:
+        """Stroke a rectangle with its top left corner at (x, y)."""
+        self.ops.append(f"{x:.2f} {PAGE_HEIGHT - y - height:.2f} {width:.2f} {height:.2f} re S")
+
+    def commit(self, doc: fitz.Document) -> None:
+        """Append a page with the collected operators to ``doc``."""
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_font(fontname='helv')
+        page.insert_font(fontname='hebo')
+        xref = doc.get_new_xref()
+        doc.update_object(xref, "<<>>")
+        doc.update_stream(xref, ("0.3 w\n" + "\n".join(self.ops)).encode('latin-1'))
+        doc.xref_set_key(page.xref, "Contents", f"{xref} 0 R")
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """Return a pseudo-random sentence."""
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + '.'
+
+
+def _many_pages(doc: fitz.Document, rng: random.Random, scale: int) -> None:
+    """Long document: a numbered heading and a few paragraphs per page."""
+    for page_num in range(200 * scale):
+        canvas = _Canvas()
+        canvas.text(MARGIN, 40, "Synthetic Benchmark Report", 8)
+        canvas.text(MARGIN, 90, f"{page_num + 1}. {_sentence(rng, 3)[:-1]}", 16, bold=True)
+        y = 120
+        for _ in range(4):
+            canvas.paragraph(MARGIN, y, ' '.join(_sentence(rng, 12) for _ in range(5)), 10,
+                             PAGE_WIDTH - 2 * MARGIN, max_lines=9)
+            y += 130
+        canvas.text(PAGE_WIDTH / 2, PAGE_HEIGHT - 30, f"Page {page_num + 1}", 8)
+        canvas.commit(doc)
+
+
+def _many_spans(doc: fitz.Document, rng: random.Random, scale: int) -> None:
+    """Every word is a separate span with its own size or weight."""
+    for _ in range(20 * scale):
+        canvas = _Canvas()
+        y = MARGIN
+        while y < PAGE_HEIGHT - MARGIN:
+            x = MARGIN
+            while x < PAGE_WIDTH - MARGIN - 60:
+                word = rng.choice(WORDS)
+                size = rng.choice((9, 10, 11))
+                canvas.text(x, y, word, size, bold=rng.random() < 0.3)
+                x += len(word) * size * 0.55 + 4
+            y += 14
+        canvas.commit(doc)
+
+
+def _dense_tables(doc: fitz.Document, rng: random.Random, scale: int) -> None:
+    """Pages of small table cells with a short heading above each table."""
+    columns, row_height = 8, 12
+    cell_width = (PAGE_WIDTH - 2 * MARGIN) / columns
+    for table_num in range(30 * scale):
+        canvas = _Canvas()
+        canvas.text(MARGIN, 60, f"Table {table_num + 1}: {_sentence(rng, 4)[:-1]}", 13, bold=True)
+        y = 80
+        while y < PAGE_HEIGHT - MARGIN:
+            for column in range(columns):
+                x = MARGIN + column * cell_width
+                canvas.rect(x, y, cell_width, row_height)
+                canvas.text(x + 2, y + 9, f"{rng.random() * 1000:.2f}", 7)
+            y += row_height
+        canvas.commit(doc)
+
+
+def _multi_column(doc: fitz.Document, rng: random.Random, scale: int) -> None:
+    """Three-column article layout with numbered section headings."""
+    columns, gutter = 3, 15
+    column_width = (PAGE_WIDTH - 2 * MARGIN - (columns - 1) * gutter) / columns
+    section = 0
+    for _ in range(40 * scale):
+        canvas = _Canvas()
+        for column in range(columns):
+            x = MARGIN + column * (column_width + gutter)
+            y = MARGIN
+            while y < PAGE_HEIGHT - MARGIN - 120:
+                section += 1
+                canvas.text(x, y + 12, f"{section}.{rng.randint(1, 9)} {rng.choice(WORDS).title()}",
+                            12, bold=True)
+                canvas.paragraph(x, y + 30, ' '.join(_sentence(rng, 8) for _ in range(4)), 8,
+                                 column_width, max_lines=9)
+                y += 125
+        canvas.commit(doc)
+
+
+SHAPES: Dict[str, Callable[[fitz.Document, random.Random, int], None]] = {
+    'many_pages': _many_pages,
+    'many_spans': _many_spans,
+    'dense_tables': _dense_tables,
+    'multi_column': _multi_column,
+}
+
+
+def generate(output_dir: Path, scale: int = 1, seed: int = 42, force: bool = False) -> Dict[str, Path]:
+    """
+    Generate the synthetic benchmark PDFs.
+
+    Existing files are reused unless ``force`` is set; the generator is
+    deterministic for a given scale and seed.
+
+    Args:
+        output_dir: Directory for the generated PDFs
+        scale: Multiplier for the page counts
+        seed: Random seed for the generated text
+        force: Regenerate files that already exist
+
+    Returns:
+        Dictionary of shape name to PDF path
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+
+    for name, build in SHAPES.items():
+        pdf_path = output_dir / f"{name}_x{scale}_s{seed}.pdf"
+        if force or not pdf_path.exists():
+            doc = fitz.open()
+            try:
+                build(doc, random.Random(f"{seed}-{name}"), scale)
+                doc.set_metadata({'title': ''})
+                doc.save(pdf_path, garbage=3, deflate=True)
+            finally:
+                doc.close()
+        paths[name] = pdf_path
+
+    return paths
+
+
+def main():
+    """Generate the synthetic PDFs from the command line."""
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark PDFs")
+    parser.add_argument("--output-dir", type=Path,
+                        default=Path(__file__).parent / ".data",
+                        help="Output directory (default: benchmarks/.data)")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for name, pdf_path in generate(args.output_dir, args.scale, args.seed, force=True).items():
+        with fitz.open(pdf_path) as doc:
+            print(f"{name:>14}: {len(doc):5d} pages  {pdf_path.stat().st_size / 1024:8.1f} KB  {pdf_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ This script processes all PDFs in the input directory and generates
 structured JSON outlines for each document.
 """
 
+import argparse
 import os
 import sys
 import time
@@ -15,64 +16,189 @@ from pathlib import Path
 # Add src to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from pdf_processor import PDFProcessor
+from batch_processor import BatchProcessor
+from pdf_processor import parse_page_ranges
+from directory_watcher import DirectoryWatcher
+from instrumentation import format_metrics_table
+from json_writer import write_json_lines
+from outline_server import serve
+from result_cache import ResultCache, default_cache_dir
+
+
+def page_ranges(value):
+    """Validate a --pages argument."""
+    try:
+        parse_page_ranges(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def positive_int(value):
+    """Validate an argument that must be a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Extract structured outlines from PDFs")
+    parser.add_argument("--input-dir", type=Path, default=Path("/app/input"),
+                        help="Directory containing input PDFs (default: /app/input)")
+    parser.add_argument("--output-dir", type=Path, default=Path("/app/output"),
+                        help="Directory for JSON outputs (default: /app/output)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes, 0 = one per CPU core (default: 1)")
+    parser.add_argument("--font-stats", choices=["page", "document"], default="page",
+                        help="Compare heading fonts against each page's average size or "
+                             "against one document-wide body size (default: page)")
+    parser.add_argument("--toc-policy", choices=["never", "auto", "always"], default="never",
+                        help="Use the PDF's embedded outline (bookmarks) instead of heuristic "
+                             "detection: never, auto (when plausible) or always (default: never)")
+    parser.add_argument("--pages", type=page_ranges, default=None,
+                        help="Only process these pages, e.g. 1-20,35,40- (outline page "
+                             "numbers stay absolute)")
+    parser.add_argument("--stride", type=positive_int, default=1,
+                        help="Only process every N-th selected page (default: 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-extract PDFs instead of reusing cached results")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Result cache directory (default: ~/.cache/pdf-outline-extractor)")
+    parser.add_argument("--cache-size-mb", type=int, default=256,
+                        help="Maximum result cache size in MB (default: 256)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and process PDFs as they are added, changed or removed")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Seconds between input directory scans in watch mode (default: 2)")
+    parser.add_argument("--title-only", action="store_true",
+                        help="Only extract titles and write them to <output-dir>/titles.jsonl")
+    parser.add_argument("--title-pages", type=int, default=1,
+                        help="Leading pages inspected when the metadata has no title (default: 1)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Per-PDF time limit in seconds; a PDF exceeding it is killed and "
+                             "recorded as failed (default: unlimited)")
+    parser.add_argument("--max-memory-mb", type=int, default=None,
+                        help="Per-PDF memory budget in MB, enforced as an address space limit "
+                             "on its worker process (default: unlimited)")
+    parser.add_argument("--output-format", choices=["json", "jsonl"], default="json",
+                        help="One <name>.json per PDF, or a single <output-dir>/outlines.jsonl "
+                             "for bulk runs (default: json)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write per-file JSON outputs without indentation")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run an HTTP service instead of batch processing: POST a PDF to "
+                             "/outline, latency and queue metrics at /metrics")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface the service listens on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="Port the service listens on (default: 8080)")
+    parser.add_argument("--queue-size", type=int, default=16,
+                        help="Uploads allowed to wait for a free worker before the service "
+                             "answers 503 (default: 16)")
+    parser.add_argument("--max-upload-mb", type=int, default=50,
+                        help="Largest PDF upload accepted by the service in MB (default: 50)")
+    parser.add_argument("--metrics", choices=["jsonl", "table"], default=None,
+                        help="Record per-stage timings and counters per document and write them "
+                             "to <output-dir>/metrics.jsonl or print them as a table")
+    args = parser.parse_args()
+    if args.watch and args.output_format == 'jsonl':
+        parser.error("--watch writes one output per PDF and cannot be combined with --output-format jsonl")
+    return args
+
+
+def write_titles(batch, pdf_files, max_pages):
+    """Extract titles only and write them as JSON lines to titles.jsonl."""
+    titles = batch.extract_titles(pdf_files, max_pages=max_pages)
+    
+    batch.output_dir.mkdir(parents=True, exist_ok=True)
+    titles_file = batch.output_dir / "titles.jsonl"
+    write_json_lines(titles_file, titles)
+    
+    print(f"✓ Wrote {len(titles)} title(s) to {titles_file}")
+
+
+def report_metrics(results, output_dir, metrics_format):
+    """Write per-document stage metrics as JSON lines or print them as a table."""
+    records = [r['metrics'] for r in results if r.get('metrics')]
+    
+    if metrics_format == 'table':
+        print(f"\nStage metrics ({len(records)} document(s) parsed):")
+        print(format_metrics_table(records))
+        return
+    
+    metrics_file = output_dir / "metrics.jsonl"
+    write_json_lines(metrics_file, records)
+    print(f"✓ Wrote metrics for {len(records)} document(s) to {metrics_file}")
 
 
 def main():
     """Main entry point for PDF processing."""
+    args = parse_args()
+
     print("Starting PDF outline extraction...")
     start_time = time.time()
     
-    # Define input and output directories
-    input_dir = Path("/app/input")
-    output_dir = Path("/app/output")
+    processor_options = {'font_stats': args.font_stats, 'toc_policy': args.toc_policy}
+    if args.metrics:
+        processor_options['collect_metrics'] = True
+    
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or default_cache_dir()
+        cache = ResultCache(cache_dir, max_bytes=args.cache_size_mb * 1024 * 1024)
+    
+    extract_options = {}
+    if args.pages:
+        extract_options['pages'] = args.pages
+    if args.stride > 1:
+        extract_options['stride'] = args.stride
+    
+    if args.serve:
+        serve(args.host, args.port, workers=args.workers, queue_size=args.queue_size,
+              max_upload_bytes=args.max_upload_mb * 1024 * 1024,
+              processor_options=processor_options)
+        return
     
-    # Create output directory if it doesn't exist
-    output_dir.mkdir(parents=True, exist_ok=True)
+    batch = BatchProcessor(args.input_dir, args.output_dir, workers=args.workers,
+                           processor_options=processor_options, cache=cache,
+                           extract_options=extract_options,
+                           output_format=args.output_format, compact=args.compact,
+                           timeout=args.timeout, max_memory_mb=args.max_memory_mb)
     
-    # Initialize PDF processor
-    processor = PDFProcessor()
+    if args.watch:
+        DirectoryWatcher(batch, poll_interval=args.poll_interval).run()
+        return
     
     # Get all PDF files from input directory
-    pdf_files = list(input_dir.glob("*.pdf"))
+    pdf_files = batch.find_pdfs()
     
     if not pdf_files:
         print("No PDF files found in input directory.")
         return
     
+    if args.title_only:
+        write_titles(batch, pdf_files, args.title_pages)
+        print(f"Total time: {time.time() - start_time:.2f} seconds")
+        return
+    
     print(f"Found {len(pdf_files)} PDF file(s) to process:")
     for pdf_file in pdf_files:
         print(f"  - {pdf_file.name}")
     
-    # Process each PDF file
-    processed_count = 0
-    for pdf_file in pdf_files:
-        try:
-            print(f"\nProcessing: {pdf_file.name}")
-            
-            # Extract outline from PDF
-            result = processor.extract_outline(pdf_file)
-            
-            # Create output JSON file
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            processor.save_result(result, output_file)
-            
-            print(f"✓ Generated: {output_file.name}")
-            processed_count += 1
-            
-        except Exception as e:
-            print(f"✗ Error processing {pdf_file.name}: {str(e)}")
-            # Continue processing other files
-            continue
+    # Process PDF files, serially or across the worker pool
+    results = batch.process_files(pdf_files)
     
     # Summary
     total_time = time.time() - start_time
-    print(f"\n{'='*50}")
-    print(f"Processing complete!")
-    print(f"Files processed: {processed_count}/{len(pdf_files)}")
-    print(f"Total time: {total_time:.2f} seconds")
-    print(f"Average time per file: {total_time/len(pdf_files):.2f} seconds")
-    print(f"{'='*50}")
+    batch.print_summary(results, total_time, batch.workers)
+    
+    if args.metrics:
+        report_metrics(results, batch.output_dir, args.metrics)
 
 
 if __name__ == "__main__":
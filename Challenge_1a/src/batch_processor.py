@@ -0,0 +1,350 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Batch Processor - Fans PDF outline extraction out across worker processes
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from pdf_processor import PDFProcessor, colored_text
+from result_cache import ResultCache
+from json_writer import write_json, write_json_lines
+from schema_validator import SchemaValidator
+from supervisor import run_supervised
+
+# Output formats: one JSON file per PDF, or one aggregate JSON-lines file
+OUTPUT_FORMATS = ('json', 'jsonl')
+AGGREGATE_FILE_NAME = "outlines.jsonl"
+
+
+# Per-process processor, created once by the pool initializer
+_worker_processor: Optional[PDFProcessor] = None
+
+
+def _init_worker(processor_options: Optional[Dict[str, Any]] = None) -> None:
+    """Create the PDF processor owned by this worker process."""
+    global _worker_processor
+    _worker_processor = PDFProcessor(**(processor_options or {}))
+
+
+def _process_file(pdf_path: Path, output_dir: Path, cache: Optional[ResultCache] = None,
+                  cache_key: Optional[str] = None,
+                  extract_options: Optional[Dict[str, Any]] = None,
+                  compact: bool = False, aggregate: bool = False,
+                  fail_on_error: bool = False) -> Dict[str, Any]:
+    """
+    Extract and save the outline of a single PDF.
+
+    Args:
+        pdf_path: Path to the PDF file
+        output_dir: Directory where the JSON output is written
+        cache: Result cache to store the extraction result in, if any
+            (fallback results of failed extractions are not cached)
+        cache_key: Cache key of the PDF
+        extract_options: Keyword arguments for PDFProcessor.extract_outline
+        compact: Write the JSON output without indentation
+        aggregate: Return the result in the record instead of writing a
+            per-file JSON output
+        fail_on_error: Record an error instead of writing the fallback
+            result if extraction failed (e.g. MuPDF ran out of its memory
+            budget)
+
+    Returns:
+        Dictionary with the file name, status, timing, heading count and
+        in-memory schema validation outcome, plus the document's stage
+        metrics if the processor collects them and the result itself when
+        aggregating
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _init_worker()
+
+    start_time = time.perf_counter()
+    try:
+        print(f"\nProcessing: {pdf_path.name}")
+        result = _worker_processor.extract_outline(pdf_path, **(extract_options or {}))
+        if fail_on_error and _worker_processor.last_error is not None:
+            raise RuntimeError(_worker_processor.last_error)
+        # A fallback result may stem from a transient error; do not pin it
+        if cache is not None and cache_key and _worker_processor.last_error is None:
+            cache.put(cache_key, result)
+
+        if aggregate:
+            is_valid = _worker_processor.check_result(result, pdf_path.name)
+        else:
+            output_file = output_dir / f"{pdf_path.stem}.json"
+            is_valid = _worker_processor.save_result(result, output_file, compact=compact)
+            print(f"✓ Generated: {output_file.name}")
+
+        record = {
+            'file': pdf_path.name,
+            'status': 'ok',
+            'seconds': time.perf_counter() - start_time,
+            'headings': len(result.get('outline', [])),
+            'valid': is_valid
+        }
+        if _worker_processor.metrics.enabled:
+            record['metrics'] = _worker_processor.metrics.to_dict()
+        if aggregate:
+            record['result'] = result
+        return record
+    except Exception as e:
+        print(f"✗ Error processing {pdf_path.name}: {str(e)}")
+        return {
+            'file': pdf_path.name,
+            'status': 'error',
+            'seconds': time.perf_counter() - start_time,
+            'headings': 0,
+            'error': str(e)
+        }
+
+
+def _extract_title(pdf_path: Path, max_pages: int) -> Dict[str, Any]:
+    """
+    Extract only the title of a single PDF.
+
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Maximum number of leading pages to inspect
+
+    Returns:
+        Dictionary with the file name and title
+    """
+    global _worker_processor
+    if _worker_processor is None:
+        _init_worker()
+
+    return {
+        'file': pdf_path.name,
+        'title': _worker_processor.extract_title(pdf_path, max_pages=max_pages)
+    }
+
+
+class BatchProcessor:
+    """Processes a directory of PDFs serially or across a process pool."""
+
+    def __init__(self, input_dir: Path, output_dir: Path, workers: int = 1,
+                 processor_options: Optional[Dict[str, Any]] = None,
+                 cache: Optional[ResultCache] = None,
+                 extract_options: Optional[Dict[str, Any]] = None,
+                 output_format: str = 'json', compact: bool = False,
+                 timeout: Optional[float] = None, max_memory_mb: Optional[int] = None):
+        """
+        Initialize the batch processor.
+
+        Args:
+            input_dir: Directory containing the input PDFs
+            output_dir: Directory where JSON outputs are written
+            workers: Number of worker processes (0 = one per CPU core)
+            processor_options: Keyword arguments for each PDFProcessor
+            cache: Result cache used to skip unchanged PDFs, or None
+            extract_options: Keyword arguments for extract_outline, such as
+                page ranges and sampling stride
+            output_format: 'json' for one <name>.json per PDF, or 'jsonl'
+                for a single outlines.jsonl with one record per PDF
+            compact: Write per-file JSON outputs without indentation
+            timeout: Wall-time limit per PDF in seconds; None = unlimited
+            max_memory_mb: Memory budget per PDF in MB; None = unlimited.
+                With either limit set, every PDF runs in its own supervised
+                child process that is killed when it exceeds the limit
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output_format: {output_format}")
+        
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.processor_options = processor_options or {}
+        self.cache = cache
+        self.extract_options = extract_options or {}
+        self.output_format = output_format
+        self.compact = compact
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+
+    def find_pdfs(self) -> List[Path]:
+        """Return the PDF files in the input directory."""
+        return list(self.input_dir.glob("*.pdf"))
+
+    def process_files(self, pdf_files: List[Path]) -> List[Dict[str, Any]]:
+        """
+        Process the given PDFs and return one result record per file.
+
+        PDFs whose content and extractor configuration match a cache entry
+        are not parsed; the cached result is written out directly. With more
+        than one worker the remaining files are scheduled largest first, so
+        the biggest documents start early and do not dominate wall time.
+        With a timeout or memory limit, each PDF runs in its own supervised
+        child process and one that exceeds its limits is recorded as failed.
+        In 'jsonl' output format all results are written together, in input
+        order, once the batch is done.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        results, pending = self._emit_cached(pdf_files)
+        output_args = (self.extract_options, self.compact, self.output_format == 'jsonl')
+
+        if self.timeout is not None or self.max_memory_mb is not None:
+            ordered = sorted(pending, key=lambda item: item[0].stat().st_size, reverse=True)
+            # Within its limits, a failed extraction is a failure, not an empty outline
+            tasks = [(pdf_file, (pdf_file, self.output_dir, self.cache, cache_key) + output_args
+                      + (True,))
+                     for pdf_file, cache_key in ordered]
+            max_memory_bytes = self.max_memory_mb * 1024 * 1024 if self.max_memory_mb else None
+            results.extend(run_supervised(tasks, _process_file, _init_worker,
+                                          (self.processor_options,), workers=self.workers,
+                                          timeout=self.timeout, max_memory_bytes=max_memory_bytes))
+            return self._finish_batch(pdf_files, results)
+
+        if self.workers == 1 or len(pending) <= 1:
+            _init_worker(self.processor_options)
+            results.extend(_process_file(pdf_file, self.output_dir, self.cache, cache_key,
+                                         *output_args)
+                           for pdf_file, cache_key in pending)
+            return self._finish_batch(pdf_files, results)
+
+        ordered = sorted(pending, key=lambda item: item[0].stat().st_size, reverse=True)
+        max_workers = min(self.workers, len(ordered))
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self.processor_options,)) as pool:
+            futures = {pool.submit(_process_file, pdf_file, self.output_dir, self.cache, cache_key,
+                                   *output_args): pdf_file
+                       for pdf_file, cache_key in ordered}
+            for future in as_completed(futures):
+                pdf_file = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # Worker process died (e.g. crashed inside MuPDF)
+                    print(f"✗ Error processing {pdf_file.name}: {str(e)}")
+                    results.append({
+                        'file': pdf_file.name,
+                        'status': 'error',
+                        'seconds': 0.0,
+                        'headings': 0,
+                        'error': str(e)
+                    })
+
+        return self._finish_batch(pdf_files, results)
+
+    def extract_titles(self, pdf_files: List[Path], max_pages: int = 1) -> List[Dict[str, Any]]:
+        """
+        Extract only the titles of the given PDFs, in input order.
+
+        Args:
+            pdf_files: PDF files to title
+            max_pages: Maximum number of leading pages inspected per PDF
+
+        Returns:
+            List of dictionaries with the file name and title
+        """
+        if self.workers == 1 or len(pdf_files) <= 1:
+            _init_worker(self.processor_options)
+            return [_extract_title(pdf_file, max_pages) for pdf_file in pdf_files]
+
+        max_workers = min(self.workers, len(pdf_files))
+        chunk_size = max(1, len(pdf_files) // (max_workers * 4))
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self.processor_options,)) as pool:
+            return list(pool.map(_extract_title, pdf_files, [max_pages] * len(pdf_files),
+                                 chunksize=chunk_size))
+
+    def _emit_cached(self, pdf_files: List[Path]) -> Tuple[List[Dict[str, Any]], List[Tuple[Path, Optional[str]]]]:
+        """
+        Write outputs for PDFs with a cached result.
+
+        Returns:
+            Tuple of (result records for cache hits, [(pdf_file, cache_key)]
+            for the PDFs that still need processing)
+        """
+        if self.cache is None:
+            return [], [(pdf_file, None) for pdf_file in pdf_files]
+
+        config = PDFProcessor(**self.processor_options).cache_config()
+        config.update(self.extract_options)
+        validator = SchemaValidator()
+        results = []
+        pending = []
+
+        for pdf_file in pdf_files:
+            start_time = time.perf_counter()
+            try:
+                cache_key = self.cache.make_key(self.cache.hash_file(pdf_file), config)
+            except OSError as e:
+                print(f"✗ Error reading {pdf_file.name}: {str(e)}")
+                pending.append((pdf_file, None))
+                continue
+
+            result = self.cache.get(cache_key)
+            if result is None:
+                pending.append((pdf_file, cache_key))
+                continue
+
+            record = {
+                'file': pdf_file.name,
+                'status': 'cached',
+                'seconds': 0.0,
+                'headings': len(result.get('outline', [])),
+                'valid': validator.validate_data(result)[0]
+            }
+            if self.output_format == 'jsonl':
+                record['result'] = result
+                print(f"✓ Cached: {pdf_file.name}")
+            else:
+                output_file = self.output_dir / f"{pdf_file.stem}.json"
+                write_json(output_file, result, compact=self.compact)
+                print(f"✓ Cached: {output_file.name}")
+
+            record['seconds'] = time.perf_counter() - start_time
+            results.append(record)
+
+        return results, pending
+
+    def _finish_batch(self, pdf_files: List[Path], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write the aggregate output if requested and prune the cache."""
+        if self.output_format == 'jsonl':
+            by_file = {r['file']: r.pop('result', None) for r in results}
+            aggregate = ({'file': pdf_file.name, **by_file[pdf_file.name]}
+                         for pdf_file in pdf_files if by_file.get(pdf_file.name) is not None)
+            aggregate_file = self.output_dir / AGGREGATE_FILE_NAME
+            count = write_json_lines(aggregate_file, aggregate)
+            print(f"✓ Wrote {count} outline(s) to {aggregate_file.name}")
+
+        self._prune_cache()
+        return results
+
+    def _prune_cache(self) -> None:
+        """Evict old cache entries once the batch is done."""
+        if self.cache is not None:
+            evicted = self.cache.prune()
+            if evicted:
+                print(f"Evicted {evicted} old cache entr{'y' if evicted == 1 else 'ies'}")
+
+    @staticmethod
+    def print_summary(results: List[Dict[str, Any]], total_time: float, workers: int) -> None:
+        """Print the merged batch summary with per-file timings."""
+        processed_count = sum(1 for r in results if r['status'] in ('ok', 'cached'))
+        cached_count = sum(1 for r in results if r['status'] == 'cached')
+        valid_count = sum(1 for r in results if r.get('valid'))
+        busy_time = sum(r['seconds'] for r in results)
+
+        print(f"\n{'='*50}")
+        print(f"Processing complete!")
+        print(f"Files processed: {processed_count}/{len(results)}")
+        print(f"Workers: {workers}")
+        if cached_count:
+            print(f"Served from cache: {cached_count}")
+        print(f"Schema validation: {valid_count}/{processed_count} passed")
+        print(f"\nPer-file timings (slowest first):")
+        for r in sorted(results, key=lambda x: x['seconds'], reverse=True):
+            status = colored_text(r['status'], '31' if r['status'] == 'error' else '32')
+            print(f"  {r['seconds']:8.2f}s  {r['headings']:4d} headings  [{status}]  {r['file']}")
+        print(f"\nTotal time: {total_time:.2f} seconds")
+        print(f"Summed per-file time: {busy_time:.2f} seconds")
+        if workers > 1 and total_time > 0:
+            print(f"Parallel speedup: {busy_time / total_time:.2f}x")
+        print(f"{'='*50}")
@@ -0,0 +1,175 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Directory Watcher - Incrementally processes PDFs as they arrive
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from batch_processor import BatchProcessor
+from pdf_processor import colored_text
+from result_cache import ResultCache
+from json_writer import write_json
+
+
+class DirectoryWatcher:
+    """
+    Polls the input directory and keeps the output directory in sync.
+
+    The watcher remembers the modification time, size and content hash of
+    every PDF it has processed, so only new or changed PDFs are processed
+    on each poll and outputs of deleted PDFs are removed. PDFs that failed
+    are remembered too and only retried once they change. The state is
+    persisted, so a restarted watcher does not rescan everything.
+    """
+
+    def __init__(self, batch: BatchProcessor, poll_interval: float = 2.0,
+                 settle_seconds: float = 1.0, state_file: Optional[Path] = None):
+        """
+        Initialize the directory watcher.
+
+        Args:
+            batch: Batch processor used to process new or changed PDFs
+            poll_interval: Seconds between directory scans
+            settle_seconds: Minimum age of a file's last modification before
+                it is processed, so partially copied files are skipped
+            state_file: Path of the persisted watch state
+                (default: <output-dir>/.watch/state.json)
+        """
+        self.batch = batch
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.state_file = Path(state_file) if state_file else batch.output_dir / ".watch" / "state.json"
+        self.state: Dict[str, Dict[str, Any]] = self._load_state()
+        self._state_changed = False
+
+    def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        """Load the persisted watch state, or start empty."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        """Persist the watch state atomically."""
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        write_json(self.state_file, self.state)
+        self._state_changed = False
+
+    def _output_path(self, file_name: str) -> Path:
+        """Return the output JSON path for an input file name."""
+        return self.batch.output_dir / f"{Path(file_name).stem}.json"
+
+    def _is_up_to_date(self, file_name: str, known: Optional[Dict[str, Any]]) -> bool:
+        """Check whether a known PDF needs no processing (failed PDFs have no output)."""
+        return bool(known) and (known.get('failed', False) or self._output_path(file_name).exists())
+
+    def scan(self) -> Tuple[List[Path], List[str], Dict[str, Dict[str, Any]]]:
+        """
+        Compare the input directory against the watch state.
+
+        Returns:
+            Tuple of (PDFs to process, names of deleted PDFs,
+            new state entries keyed by file name for the PDFs to process)
+        """
+        now = time.time()
+        changed = []
+        entries = {}
+        present = set()
+
+        for pdf_file in self.batch.find_pdfs():
+            try:
+                stat = pdf_file.stat()
+            except OSError:
+                continue
+            present.add(pdf_file.name)
+
+            known = self.state.get(pdf_file.name)
+            if (known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size
+                    and self._is_up_to_date(pdf_file.name, known)):
+                continue
+
+            # Still being written; pick it up on a later poll
+            if now - stat.st_mtime < self.settle_seconds:
+                continue
+
+            try:
+                content_hash = ResultCache.hash_file(pdf_file)
+            except OSError:
+                continue
+
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': content_hash}
+            if (known and known['sha256'] == content_hash
+                    and self._is_up_to_date(pdf_file.name, known)):
+                # Touched but unchanged content: just record the new mtime
+                self.state[pdf_file.name] = dict(known, **entry)
+                self._state_changed = True
+                continue
+
+            changed.append(pdf_file)
+            entries[pdf_file.name] = entry
+
+        deleted = [name for name in self.state if name not in present]
+        return changed, deleted, entries
+
+    def poll(self) -> Dict[str, int]:
+        """
+        Run one incremental pass over the input directory.
+
+        Returns:
+            Counts of processed, failed and removed files
+        """
+        changed, deleted, entries = self.scan()
+        counts = {'processed': 0, 'failed': 0, 'removed': 0}
+
+        for file_name in deleted:
+            output_path = self._output_path(file_name)
+            if output_path.exists():
+                output_path.unlink()
+                print(f"✓ Removed: {output_path.name}")
+            del self.state[file_name]
+            self._state_changed = True
+            counts['removed'] += 1
+
+        if changed:
+            for result in self.batch.process_files(changed):
+                if result['status'] == 'error':
+                    # Retried only when the file changes, not on every poll
+                    counts['failed'] += 1
+                    self.state[result['file']] = dict(entries[result['file']], failed=True)
+                else:
+                    counts['processed'] += 1
+                    self.state[result['file']] = entries[result['file']]
+                self._state_changed = True
+
+        if self._state_changed:
+            self._save_state()
+        return counts
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        """
+        Poll the input directory until interrupted.
+
+        Args:
+            max_polls: Stop after this many polls (None = run forever)
+        """
+        print(f"Watching {self.batch.input_dir} (every {self.poll_interval:g}s, Ctrl+C to stop)...")
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                start_time = time.perf_counter()
+                counts = self.poll()
+                polls += 1
+
+                if any(counts.values()):
+                    elapsed = time.perf_counter() - start_time
+                    print(f"{colored_text('Sync:', '36')} {counts['processed']} processed, "
+                          f"{counts['failed']} failed, {counts['removed']} removed "
+                          f"in {elapsed:.2f} seconds")
+
+                if max_polls is None or polls < max_polls:
+                    time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
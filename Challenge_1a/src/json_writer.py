@@ -0,0 +1,89 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+JSON Writer - Fast, atomic JSON and JSON-lines output
+"""
+
+import json
+import os
+import secrets
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+def dumps(data: Any, compact: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON.
+
+    Uses orjson when it is installed and falls back to the standard
+    library otherwise (or for data orjson rejects); both produce the same
+    bytes for extraction results.
+
+    Args:
+        data: JSON-serializable data
+        compact: Omit indentation and whitespace
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write bytes to a temporary file next to ``path`` and rename it into place."""
+    path = Path(path)
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    # Created like open() would (0666 minus the umask), never over an existing file
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(path: Path, data: Any, compact: bool = False) -> None:
+    """
+    Atomically write a JSON file.
+
+    Readers never observe a partially written file: the document is
+    written to a temporary file in the same directory and renamed over
+    the destination.
+
+    Args:
+        path: Destination file
+        data: JSON-serializable data
+        compact: Omit indentation and whitespace
+    """
+    _write_atomic(path, dumps(data, compact=compact))
+
+
+def write_json_lines(path: Path, records: Iterable[Any]) -> int:
+    """
+    Atomically write records as JSON lines (one compact document per line).
+
+    Args:
+        path: Destination file
+        records: JSON-serializable records
+
+    Returns:
+        Number of records written
+    """
+    lines = [dumps(record, compact=True) + b'\n' for record in records]
+    _write_atomic(path, b''.join(lines))
+    return len(lines)
@@ -4,8 +4,17 @@ Outline Extractor - Intelligent heading and title detection from PDFs
 """
 
 import re
-from typing import Dict, List, Any, Optional, Tuple
-from utils import FontAnalyzer, TextProcessor
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+from utils import FontAnalyzer, RunningTextIndex, SpanTable, TextProcessor
+from instrumentation import NULL_METRICS
+
+# First unnamed capturing group in a heading pattern
+_CAPTURING_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+# Explicit numbering prefixes used to pin heading levels
+_H1_NUMBERING = re.compile(r'^\d+\.\s+')
+_H2_NUMBERING = re.compile(r'^\d+\.\d+\s+')
+_H3_NUMBERING = re.compile(r'^\d+\.\d+\.\d+\s+')
 
 
 class OutlineExtractor:
@@ -16,6 +25,17 @@ class OutlineExtractor:
         self.font_analyzer = FontAnalyzer()
         self.text_processor = TextProcessor()
         
+        # Stage timings and counters; replaced per document by PDFProcessor
+        self.metrics = NULL_METRICS
+        
+        # Font sizes closer than this (in points) share a heading level
+        self.size_tolerance = 0.5
+        
+        # Running header/footer detection: candidates in the top or bottom
+        # margin band repeated on this many pages are dropped (0 = off)
+        self.running_text_min_pages = 3
+        self.running_text_margin = 0.15
+        
         # Heading detection patterns
         self.heading_patterns = [
             r'^\d+\.\s+(.+)$',                    # 1. Introduction
@@ -28,14 +48,50 @@ class OutlineExtractor:
             r'^•\s+(.+)$',                        # Bullet points
             r'^-\s+(.+)$',                        # Dash points
         ]
+        
+        # All patterns compiled once into a single alternation, so each
+        # line is tested with one regex call
+        self._heading_regex, self._heading_text_groups = \
+            self._compile_heading_patterns(self.heading_patterns)
+    
+    @staticmethod
+    def _compile_heading_patterns(patterns: List[str]) -> Tuple['re.Pattern', List[Optional[str]]]:
+        """
+        Combine anchored heading patterns into one compiled alternation.
+        
+        Pattern ``i`` becomes the named group ``p{i}`` and its capturing
+        group (the heading text, if any) becomes ``p{i}_text``. Alternatives
+        are tried in list order, so the first matching pattern wins exactly
+        as with sequential ``re.match`` calls.
+        
+        Args:
+            patterns: Regex strings anchored with ``^`` and ``$``
+            
+        Returns:
+            Tuple of (compiled pattern, text group name per pattern or None)
+        """
+        alternatives = []
+        text_groups = []
+        for i, pattern in enumerate(patterns):
+            if not (pattern.startswith('^') and pattern.endswith('$')):
+                raise ValueError(f"Heading pattern must be anchored: {pattern}")
+            body, group_count = _CAPTURING_GROUP.subn(f'(?P<p{i}_text>', pattern[1:-1], count=1)
+            alternatives.append(f'(?P<p{i}>{body})')
+            text_groups.append(f'p{i}_text' if group_count else None)
+        
+        return re.compile('^(?:' + '|'.join(alternatives) + ')$'), text_groups
     
-    def extract_title(self, metadata: Dict, pages_content: List[Dict]) -> str:
+    def extract_title(self, metadata: Dict, pages_content: Iterable[Dict]) -> str:
         """
         Extract document title using multiple strategies.
         
+        Pages are only consumed if the metadata has no usable title, and
+        only until a title is found, so ``pages_content`` may be a lazy
+        generator over the first few pages.
+        
         Args:
             metadata: PDF metadata dictionary
-            pages_content: List of page content dictionaries
+            pages_content: Iterable of page content dictionaries, first page first
             
         Returns:
             Extracted title string
@@ -47,12 +103,15 @@ class OutlineExtractor:
                 print(f"  Title from metadata: {title}")
                 return title
         
-        # Strategy 2: Extract from first page using font analysis
-        if pages_content:
-            first_page = pages_content[0]
-            title = self._extract_title_from_page(first_page)
+        # Strategy 2: Extract from the first page(s) using font analysis
+        for page_content in pages_content:
+            title = self._extract_title_from_page(page_content)
             if title:
-                print(f"  Title from first page: {title}")
+                page_num = page_content.get('page_num', 1)
+                if page_num == 1:
+                    print(f"  Title from first page: {title}")
+                else:
+                    print(f"  Title from page {page_num}: {title}")
                 return title
         
         # Strategy 3: Use filename as fallback
@@ -61,41 +120,31 @@ class OutlineExtractor:
     
     def _extract_title_from_page(self, page_content: Dict) -> Optional[str]:
         """Extract title from first page using font analysis."""
-        text_dict = page_content.get('text_dict', {})
+        spans = self._get_span_table(page_content)
         
-        if not text_dict or 'blocks' not in text_dict:
+        if spans is None or not spans.span_count:
             return None
         
         candidates = []
         
-        # Analyze text blocks for potential titles
-        for block in text_dict['blocks']:
-            if 'lines' not in block:
+        # Analyze text spans for potential titles
+        for text, font_size, font_flags in spans.iter_spans():
+            text = text.strip()
+            
+            # Skip empty or very short text
+            if not text or len(text) < 5:
                 continue
-                
-            for line in block['lines']:
-                if 'spans' not in line:
-                    continue
-                    
-                for span in line['spans']:
-                    text = span.get('text', '').strip()
-                    font_size = span.get('size', 0)
-                    font_flags = span.get('flags', 0)
-                    
-                    # Skip empty or very short text
-                    if not text or len(text) < 5:
-                        continue
-                    
-                    # Skip common non-title patterns
-                    if any(pattern in text.lower() for pattern in 
-                          ['page', 'abstract', 'introduction', 'contents', 'index']):
-                        continue
-                    
-                    # Calculate title score based on font characteristics
-                    score = self._calculate_title_score(text, font_size, font_flags)
-                    
-                    if score > 0:
-                        candidates.append((text, score, font_size))
+            
+            # Skip common non-title patterns
+            if any(pattern in text.lower() for pattern in 
+                  ['page', 'abstract', 'introduction', 'contents', 'index']):
+                continue
+            
+            # Calculate title score based on font characteristics
+            score = self._calculate_title_score(text, font_size, font_flags)
+            
+            if score > 0:
+                candidates.append((text, score, font_size))
         
         # Return the highest scoring candidate
         if candidates:
@@ -104,6 +153,16 @@ class OutlineExtractor:
         
         return None
     
+    def _get_span_table(self, page_content: Dict) -> Optional[SpanTable]:
+        """Return the page's span table, building it from a text dict if needed."""
+        spans = page_content.get('spans')
+        if spans is None:
+            text_dict = page_content.get('text_dict')
+            if not text_dict or 'blocks' not in text_dict:
+                return None
+            spans = SpanTable.from_text_dict(text_dict)
+        return spans
+    
     def _calculate_title_score(self, text: str, font_size: float, font_flags: int) -> float:
         """Calculate likelihood score for text being a title."""
         score = 0.0
@@ -141,159 +200,201 @@ class OutlineExtractor:
         
         return score
     
-    def extract_headings(self, pages_content: List[Dict]) -> List[Dict[str, Any]]:
+    def extract_headings(self, pages_content: Iterable[Dict],
+                         body_size: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Extract hierarchical headings from all pages.
         
+        Pages are consumed one at a time, so ``pages_content`` may be a
+        generator; only the compact candidate list is kept across pages.
+        
         Args:
-            pages_content: List of page content dictionaries
+            pages_content: Iterable of page content dictionaries
+            body_size: Document-wide body font size; when given, lines are
+                classified against it instead of each page's average size
             
         Returns:
             List of heading dictionaries with level, text, and page
         """
         headings = []
+        running_index = RunningTextIndex(min_pages=self.running_text_min_pages)
         
         for page_content in pages_content:
             page_num = page_content['page_num']
-            page_headings = self._extract_headings_from_page(page_content)
+            page_height = page_content.get('height')
+            page_headings = self._extract_headings_from_page(page_content, body_size)
             
-            # Add page number to each heading
             for heading in page_headings:
-                heading['page'] = page_num
-                headings.append(heading)
+                # Keep only the fields needed for hierarchy processing
+                compact = self._compact_candidate(heading, page_num)
+                
+                key = self._running_text_key(heading, page_height, running_index)
+                if key is not None:
+                    if running_index.add(key, page_num):
+                        # Known running header/footer: drop right away
+                        continue
+                    compact['running_key'] = key
+                
+                headings.append(compact)
+        
+        # Drop earlier occurrences of lines that turned out to repeat
+        headings = [heading for heading in headings
+                    if not running_index.is_repeated(heading.pop('running_key', None))]
         
         # Post-process headings to assign proper hierarchy levels
-        processed_headings = self._process_heading_hierarchy(headings)
+        with self.metrics.stage('hierarchy'):
+            processed_headings = self._process_heading_hierarchy(headings)
+        self.metrics.count('headings', len(processed_headings))
         
         print(f"  Extracted {len(processed_headings)} headings")
         return processed_headings
     
-    def _extract_headings_from_page(self, page_content: Dict) -> List[Dict[str, Any]]:
+    def _running_text_key(self, candidate: Dict[str, Any], page_height: Optional[float],
+                          running_index: RunningTextIndex) -> Optional[int]:
+        """Return the running text key of a candidate in a page margin band, else None."""
+        if not self.running_text_min_pages or not page_height or 'y0' not in candidate:
+            return None
+        
+        margin = page_height * self.running_text_margin
+        if candidate['y0'] > margin and candidate['y1'] < page_height - margin:
+            return None
+        
+        return running_index.make_key(candidate['text'], candidate['y0'])
+    
+    def _compact_candidate(self, candidate: Dict[str, Any], page_num: int) -> Dict[str, Any]:
+        """Reduce a heading candidate to the fields used by the hierarchy stage."""
+        compact = {
+            'text': candidate['text'],
+            'confidence': candidate.get('confidence', 0),
+            'page': page_num
+        }
+        if 'font_size' in candidate:
+            compact['font_size'] = candidate['font_size']
+        return compact
+    
+    def _extract_headings_from_page(self, page_content: Dict,
+                                    body_size: Optional[float] = None) -> List[Dict[str, Any]]:
         """Extract potential headings from a single page."""
-        text_dict = page_content.get('text_dict', {})
+        spans = self._get_span_table(page_content)
         plain_text = page_content.get('plain_text', '')
         
+        metrics = self.metrics
         candidates = []
         
         # Strategy 1: Font-based detection
-        font_candidates = self._extract_by_font_analysis(text_dict)
+        with metrics.stage('font_analysis'):
+            font_candidates = self._extract_by_font_analysis(spans, body_size)
         candidates.extend(font_candidates)
         
         # Strategy 2: Pattern-based detection
-        pattern_candidates = self._extract_by_patterns(plain_text)
+        line_positions = (spans.line_y0, spans.line_y1) if spans is not None else None
+        with metrics.stage('patterns'):
+            pattern_candidates = self._extract_by_patterns(plain_text, line_positions)
         candidates.extend(pattern_candidates)
         
+        metrics.count('font_candidates', len(font_candidates))
+        metrics.count('pattern_candidates', len(pattern_candidates))
+        
         # Remove duplicates and sort by confidence
         unique_candidates = self._deduplicate_candidates(candidates)
         
         return unique_candidates
     
-    def _extract_by_font_analysis(self, text_dict: Dict) -> List[Dict[str, Any]]:
+    def _extract_by_font_analysis(self, spans: Optional[SpanTable],
+                                  body_size: Optional[float] = None) -> List[Dict[str, Any]]:
         """Extract headings based on font characteristics."""
         candidates = []
         
-        if not text_dict or 'blocks' not in text_dict:
+        if spans is None or not spans.span_count:
             return candidates
         
-        # Collect all font sizes to determine relative sizes
-        font_sizes = []
-        for block in text_dict['blocks']:
-            if 'lines' not in block:
-                continue
-            for line in block['lines']:
-                if 'spans' not in line:
-                    continue
-                for span in line['spans']:
-                    size = span.get('size', 0)
-                    if size > 0:
-                        font_sizes.append(size)
-        
-        if not font_sizes:
-            return candidates
+        # Use the document-wide body size if known, otherwise calculate
+        # font size thresholds from the page's span sizes
+        if body_size:
+            avg_size = body_size
+        else:
+            avg_size, max_size = self.font_analyzer.size_statistics(spans)
         
-        # Calculate font size thresholds
-        avg_size = sum(font_sizes) / len(font_sizes)
-        max_size = max(font_sizes)
+        if not avg_size:
+            return candidates
         
         # Extract text with larger fonts as potential headings
-        for block in text_dict['blocks']:
-            if 'lines' not in block:
+        for line_index, (line_text, line_size, line_flags) in enumerate(spans.iter_lines()):
+            line_text = line_text.strip()
+            
+            # Skip empty lines or very short text
+            if not line_text or len(line_text) < 3:
                 continue
+            
+            # Check if this could be a heading based on font size
+            size_ratio = line_size / avg_size if avg_size > 0 else 1
+            
+            if size_ratio >= 1.2 or line_size >= avg_size + 2:
+                confidence = min(size_ratio, 3.0)
                 
-            for line in block['lines']:
-                if 'spans' not in line:
-                    continue
-                
-                # Combine text from all spans in the line
-                line_text = ''
-                line_size = 0
-                line_flags = 0
-                
-                for span in line['spans']:
-                    line_text += span.get('text', '')
-                    line_size = max(line_size, span.get('size', 0))
-                    line_flags |= span.get('flags', 0)
-                
-                line_text = line_text.strip()
-                
-                # Skip empty lines or very short text
-                if not line_text or len(line_text) < 3:
-                    continue
-                
-                # Check if this could be a heading based on font size
-                size_ratio = line_size / avg_size if avg_size > 0 else 1
+                # Boost confidence for bold text
+                if line_flags & 2**4:  # Bold
+                    confidence += 0.5
                 
-                if size_ratio >= 1.2 or line_size >= avg_size + 2:
-                    confidence = min(size_ratio, 3.0)
-                    
-                    # Boost confidence for bold text
-                    if line_flags & 2**4:  # Bold
-                        confidence += 0.5
-                    
-                    candidates.append({
-                        'text': line_text,
-                        'confidence': confidence,
-                        'font_size': line_size,
-                        'method': 'font_analysis'
-                    })
+                candidates.append({
+                    'text': line_text,
+                    'confidence': confidence,
+                    'font_size': line_size,
+                    'method': 'font_analysis',
+                    'y0': spans.line_y0[line_index],
+                    'y1': spans.line_y1[line_index]
+                })
         
         return candidates
     
-    def _extract_by_patterns(self, plain_text: str) -> List[Dict[str, Any]]:
-        """Extract headings based on text patterns."""
+    def _extract_by_patterns(self, plain_text: str,
+                             line_positions: Optional[Tuple[Any, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract headings based on text patterns.
+        
+        ``line_positions`` optionally gives the (top, bottom) coordinates of
+        every line of ``plain_text``; they are attached to the candidates.
+        """
         candidates = []
         
         lines = plain_text.split('\n')
+        if line_positions is not None and len(line_positions[0]) != len(lines):
+            line_positions = None
         
-        for line in lines:
+        for line_index, line in enumerate(lines):
             line = line.strip()
             if not line or len(line) < 3:
                 continue
             
-            # Test against heading patterns
-            for pattern in self.heading_patterns:
-                match = re.match(pattern, line)
-                if match:
-                    # Extract the heading text (removing numbering)
-                    if match.groups():
-                        heading_text = match.group(1).strip()
-                    else:
-                        heading_text = line.strip()
+            # Test against all heading patterns at once
+            match = self._heading_regex.match(line)
+            if match:
+                pattern_index = int(match.lastgroup[1:])
+                text_group = self._heading_text_groups[pattern_index]
+                
+                # Extract the heading text (removing numbering)
+                if text_group:
+                    heading_text = match.group(text_group).strip()
+                else:
+                    heading_text = line.strip()
+                
+                if heading_text and len(heading_text) >= 3:
+                    confidence = 1.0
+                    
+                    # Boost confidence for numbered patterns
+                    if any(char.isdigit() for char in line[:10]):
+                        confidence += 0.5
                     
-                    if heading_text and len(heading_text) >= 3:
-                        confidence = 1.0
-                        
-                        # Boost confidence for numbered patterns
-                        if any(char.isdigit() for char in line[:10]):
-                            confidence += 0.5
-                        
-                        candidates.append({
-                            'text': heading_text,
-                            'confidence': confidence,
-                            'pattern': pattern,
-                            'method': 'pattern_matching'
-                        })
-                    break
+                    candidate = {
+                        'text': heading_text,
+                        'confidence': confidence,
+                        'pattern': self.heading_patterns[pattern_index],
+                        'method': 'pattern_matching'
+                    }
+                    if line_positions is not None:
+                        candidate['y0'] = line_positions[0][line_index]
+                        candidate['y1'] = line_positions[1][line_index]
+                    candidates.append(candidate)
         
         return candidates
     
@@ -326,7 +427,15 @@ class OutlineExtractor:
         return unique_candidates
     
     def _process_heading_hierarchy(self, headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Process headings to assign proper hierarchy levels (H1, H2, H3)."""
+        """
+        Process headings to assign proper hierarchy levels (H1, H2, H3).
+        
+        All candidate font sizes are clustered once up front (sorted unique
+        sizes, merged within ``size_tolerance``), so levels are assigned in
+        a single pass that does not depend on the order of the headings.
+        Pattern-only candidates have no font size; they are left out of the
+        clustering and placed one level below the smallest clustered size.
+        """
         if not headings:
             return []
         
@@ -336,17 +445,23 @@ class OutlineExtractor:
             x.get('font_size', 0)
         ), reverse=True)
         
+        # Cluster the distinct heading font sizes into levels once
+        size_levels = self.font_analyzer.cluster_font_sizes(
+            (heading['font_size'] for heading in headings if 'font_size' in heading),
+            tolerance=self.size_tolerance
+        )
+        unsized_level = min(max(size_levels.values(), default=0) + 1, 3)
+        
         # Assign hierarchy levels based on font sizes and patterns
         processed = []
-        font_size_to_level = {}
         
         for heading in sorted_headings:
             text = heading['text']
-            font_size = heading.get('font_size', 12)
+            font_size = heading.get('font_size')
             page = heading['page']
             
             # Determine hierarchy level
-            level = self._determine_heading_level(text, font_size, font_size_to_level)
+            level = self._determine_heading_level(text, font_size, size_levels, unsized_level)
             
             processed.append({
                 'level': level,
@@ -359,56 +474,19 @@ class OutlineExtractor:
         
         return processed
     
-    def _determine_heading_level(self, text: str, font_size: float, 
-                               font_size_to_level: Dict[float, str]) -> str:
+    def _determine_heading_level(self, text: str, font_size: Optional[float],
+                               size_levels: Dict[float, int], unsized_level: int = 3) -> str:
         """Determine the hierarchy level (H1, H2, H3) for a heading."""
         
         # Check for explicit numbering patterns
-        if re.match(r'^\d+\.\s+', text):
+        if _H1_NUMBERING.match(text):
             return 'H1'
-        elif re.match(r'^\d+\.\d+\s+', text):
+        elif _H2_NUMBERING.match(text):
             return 'H2'
-        elif re.match(r'^\d+\.\d+\.\d+\s+', text):
+        elif _H3_NUMBERING.match(text):
             return 'H3'
         
-        # Use font size mapping
-        if font_size in font_size_to_level:
-            return font_size_to_level[font_size]
-        
-        # Assign level based on relative font size
-        existing_sizes = sorted(font_size_to_level.keys(), reverse=True)
-        
-        if not existing_sizes:
-            # First heading - assign H1
-            font_size_to_level[font_size] = 'H1'
-            return 'H1'
-        
-        # Compare with existing font sizes
-        if font_size > existing_sizes[0]:
-            # Larger than existing - this is H1, demote others
-            new_mapping = {font_size: 'H1'}
-            for size in existing_sizes:
-                current_level = font_size_to_level[size]
-                if current_level == 'H1':
-                    new_mapping[size] = 'H2'
-                elif current_level == 'H2':
-                    new_mapping[size] = 'H3'
-                else:
-                    new_mapping[size] = 'H3'
-            font_size_to_level.update(new_mapping)
-            return 'H1'
-        
-        elif font_size >= existing_sizes[0]:
-            # Same as largest - also H1
-            font_size_to_level[font_size] = 'H1'
-            return 'H1'
-        
-        elif len(existing_sizes) == 1:
-            # Second font size - assign H2
-            font_size_to_level[font_size] = 'H2'
-            return 'H2'
-        
-        else:
-            # Third or smaller font size - assign H3
-            font_size_to_level[font_size] = 'H3'
-            return 'H3'
+        # Use the clustered font size levels
+        if font_size is None:
+            return f"H{unsized_level}"
+        return f"H{size_levels.get(font_size, 3)}"
@@ -0,0 +1,360 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Outline Server - asyncio HTTP service backed by warm worker processes
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from pdf_processor import PDFProcessor, colored_text, parse_page_ranges
+from json_writer import dumps
+
+
+# Per-process processor, created once by the pool initializer
+_worker_processor: Optional[PDFProcessor] = None
+# Start-up barrier shared by the workers of one pool
+_warm_up_barrier: Optional[threading.Barrier] = None
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+def _init_worker(processor_options: Optional[Dict[str, Any]] = None, barrier=None) -> None:
+    """Create the PDF processor owned by this worker process."""
+    global _worker_processor, _warm_up_barrier
+    _worker_processor = PDFProcessor(**(processor_options or {}))
+    _warm_up_barrier = barrier
+
+
+def _warm_up() -> int:
+    """
+    Wait until every worker of the pool has started.
+
+    Each warm-up task holds its worker until all of them arrive, so
+    ``workers`` warm-up tasks start ``workers`` distinct processes, each of
+    which has run ``_init_worker``.
+    """
+    if _warm_up_barrier is not None:
+        _warm_up_barrier.wait(timeout=60)
+    return os.getpid()
+
+
+def _extract_from_bytes(data: bytes, name: str, pages: Optional[str], stride: int) -> Dict[str, Any]:
+    """Extract the outline of an uploaded PDF in a worker process."""
+    global _worker_processor
+    if _worker_processor is None:
+        _init_worker()
+    return _worker_processor.extract_outline_from_bytes(data, name, pages=pages, stride=stride)
+
+
+class HTTPError(Exception):
+    """Request error answered with an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ServerMetrics:
+    """Request counters, queue depth and a rolling latency window."""
+
+    def __init__(self, window: int = 1024):
+        """
+        Initialize the metrics.
+
+        Args:
+            window: Number of most recent request latencies kept
+        """
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+
+    def observe(self, seconds: float, ok: bool) -> None:
+        """Record a finished extraction request."""
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self, workers: int) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dictionary."""
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'rejected': self.rejected,
+            'pool_restarts': self.pool_restarts,
+            'in_flight': self.in_flight,
+            'queue_depth': max(0, self.in_flight - workers),
+            'workers': workers,
+            'latency_ms': {
+                'count': len(latencies),
+                'mean': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+            }
+        }
+
+
+class OutlineServer:
+    """
+    Minimal HTTP/1.1 service for outline extraction.
+
+    Endpoints:
+        POST /outline   raw PDF body (optional ?name=, ?pages=, ?stride=),
+                        answers the outline JSON
+        GET  /metrics   request latency percentiles, queue depth, counters
+        GET  /health    liveness check
+
+    Uploads are handed to a pool of warm worker processes. At most
+    ``workers + queue_size`` extractions are admitted at once; further
+    uploads are rejected with 503 right away instead of piling up. If a
+    worker dies (e.g. crashes inside MuPDF), the pool is rebuilt and only
+    the request that crashed it fails.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, workers: int = 1,
+                 queue_size: int = 16, max_upload_bytes: int = 50 * 1024 * 1024,
+                 processor_options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the outline server.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on (0 = pick a free port)
+            workers: Number of worker processes (0 = one per CPU core)
+            queue_size: Uploads allowed to wait for a free worker
+            max_upload_bytes: Largest accepted upload
+            processor_options: Keyword arguments for each PDFProcessor
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.queue_size = queue_size
+        self.max_upload_bytes = max_upload_bytes
+        self.processor_options = processor_options or {}
+        self.metrics = ServerMetrics()
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+
+    async def _start_pool(self) -> ProcessPoolExecutor:
+        """Create a worker pool and wait until every worker is warm."""
+        # Forked workers would inherit open client sockets (a pool rebuilt
+        # mid-request keeps those connections from ever closing)
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        barrier = context.Barrier(self.workers)
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                   initializer=_init_worker,
+                                   initargs=(self.processor_options, barrier))
+        # Warm every worker up front so the first requests do not pay for it
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(pool, _warm_up) for _ in range(self.workers)))
+        return pool
+
+    async def _restart_pool(self, broken_pool: ProcessPoolExecutor) -> None:
+        """Replace a broken worker pool (once, however many requests saw it break)."""
+        async with self._pool_lock:
+            if self.pool is not broken_pool:
+                return
+            broken_pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = await self._start_pool()
+            self.metrics.pool_restarts += 1
+            print(f"{colored_text('Restarted', '33')} worker pool after a worker process died")
+
+    async def start(self) -> None:
+        """Start the worker pool and begin listening."""
+        self._pool_lock = asyncio.Lock()
+        self.pool = await self._start_pool()
+
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and shut the worker pool down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self) -> None:
+        """Run the server until cancelled."""
+        await self.start()
+        print(f"{colored_text('Serving', '36')} outline extraction on http://{self.host}:{self.port} "
+              f"({self.workers} worker(s), queue {self.queue_size})")
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Serve one request per connection."""
+        try:
+            try:
+                method, target, headers = await self._read_head(reader)
+                status, payload, extra_headers = await self._route(method, target, headers, reader)
+            except HTTPError as e:
+                status, payload, extra_headers = e.status, {'error': e.message}, {}
+            await self._write_response(writer, status, payload, extra_headers)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        """Read and parse the request line and headers."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Request headers too large")
+
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    async def _route(self, method: str, target: str, headers: Dict[str, str],
+                     reader: asyncio.StreamReader) -> Tuple[int, Any, Dict[str, str]]:
+        """Dispatch a request to its endpoint."""
+        url = urlsplit(target)
+
+        if url.path == '/health':
+            return 200, {'status': 'ok'}, {}
+        if url.path == '/metrics':
+            return 200, self.metrics.snapshot(self.workers), {}
+        if url.path != '/outline':
+            raise HTTPError(404, f"Unknown endpoint: {url.path}")
+        if method != 'POST':
+            raise HTTPError(405, "Use POST with the PDF as request body")
+
+        return await self._handle_outline(parse_qs(url.query), headers, reader)
+
+    async def _handle_outline(self, query: Dict[str, List[str]], headers: Dict[str, str],
+                              reader: asyncio.StreamReader) -> Tuple[int, Any, Dict[str, str]]:
+        """Extract the outline of an uploaded PDF."""
+        if 'content-length' not in headers:
+            raise HTTPError(411, "Content-Length is required")
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_upload_bytes:
+            raise HTTPError(413, f"Upload exceeds {self.max_upload_bytes} bytes")
+
+        name = query.get('name', ['upload.pdf'])[0]
+        pages = query.get('pages', [None])[0]
+        try:
+            stride = int(query.get('stride', ['1'])[0])
+            if stride < 1:
+                raise ValueError(f"stride must be at least 1, got {stride}")
+            if pages:
+                parse_page_ranges(pages)
+        except ValueError as e:
+            # Consume the upload so the client reads the error, not a reset
+            await reader.readexactly(length)
+            raise HTTPError(400, str(e))
+
+        # Backpressure: reject instead of queueing without bound
+        if self.metrics.in_flight >= self.workers + self.queue_size:
+            self.metrics.rejected += 1
+            await reader.readexactly(length)
+            return 503, {'error': "Server busy, retry later"}, {'Retry-After': '1'}
+
+        self.metrics.in_flight += 1
+        start_time = time.perf_counter()
+        ok = False
+        try:
+            data = await reader.readexactly(length)
+            result = await self._extract(data, name, pages, stride)
+            ok = True
+            return 200, result, {}
+        except asyncio.IncompleteReadError:
+            raise
+        except Exception as e:
+            # Worker process died (e.g. crashed inside MuPDF)
+            raise HTTPError(500, f"Extraction failed: {str(e)}")
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(time.perf_counter() - start_time, ok)
+
+    async def _extract(self, data: bytes, name: str, pages: Optional[str], stride: int) -> Dict[str, Any]:
+        """
+        Run an extraction on the worker pool.
+
+        When a worker dies, every extraction in flight on that pool fails
+        with BrokenProcessPool. Each of them is retried once on the rebuilt
+        pool, so only an upload that crashes a worker again fails.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self.pool
+            try:
+                return await loop.run_in_executor(pool, _extract_from_bytes, data, name, pages, stride)
+            except BrokenProcessPool:
+                await self._restart_pool(pool)
+                if attempt:
+                    raise
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int, payload: Any,
+                              extra_headers: Dict[str, str]) -> None:
+        """Write a JSON response and close the connection."""
+        body = dumps(payload, compact=True)
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        head.extend(f"{key}: {value}" for key, value in extra_headers.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+        writer.write(body)
+        await writer.drain()
+
+
+def serve(host: str = "127.0.0.1", port: int = 8080, workers: int = 1, queue_size: int = 16,
+          max_upload_bytes: int = 50 * 1024 * 1024,
+          processor_options: Optional[Dict[str, Any]] = None) -> None:
+    """Run the outline server until interrupted."""
+    server = OutlineServer(host, port, workers=workers, queue_size=queue_size,
+                           max_upload_bytes=max_upload_bytes, processor_options=processor_options)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
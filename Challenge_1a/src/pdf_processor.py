@@ -3,146 +3,610 @@ Adobe India Hackathon 2025 - Challenge 1A
 PDF Processor - Main PDF processing and coordination module
 """
 
-import json
+import threading
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import BinaryIO, Callable, Dict, List, Any, Iterator, Optional, Tuple
 from outline_extractor import OutlineExtractor
+from utils import SpanTable
+from instrumentation import DocumentMetrics, NULL_METRICS
+from json_writer import write_json
+from schema_validator import SchemaValidator
+
+# Bump whenever a change alters extraction results, so cached results
+# from older versions are not reused
+EXTRACTOR_VERSION = "1.3.2"
+
+# Policies for using the embedded PDF outline (see PDFProcessor)
+TOC_POLICIES = ('never', 'auto', 'always')
+
+# Text extraction flags for get_text("dict"): same as the default but
+# without image blocks, which are never used for outline detection
+TEXT_EXTRACTION_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
 
 def colored_text(text: str, color_code: str) -> str:
     """Return colored text for terminal output."""
     return f"\033[{color_code}m{text}\033[0m"
 
 
+def parse_page_ranges(spec: str) -> List[Tuple[int, Optional[int]]]:
+    """
+    Parse a page range specification such as "1-20,35,40-".
+    
+    Args:
+        spec: Comma-separated 1-based pages or inclusive ranges; a range
+            without an end ("40-") runs to the last page
+        
+    Returns:
+        List of (first_page, last_page or None) tuples
+        
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        
+        first, separator, last = part.partition('-')
+        try:
+            first_page = int(first)
+            last_page = (int(last) if last.strip() else None) if separator else first_page
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        
+        if first_page < 1 or (last_page is not None and last_page < first_page):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((first_page, last_page))
+    
+    if not ranges:
+        raise ValueError(f"Empty page range specification: {spec!r}")
+    return ranges
+
+
+def select_pages(page_count: int, pages: Optional[str] = None, stride: int = 1) -> List[int]:
+    """
+    Select the 0-based page indices to process.
+    
+    Args:
+        page_count: Number of pages in the document
+        pages: Page range specification (see parse_page_ranges), or None
+            for every page
+        stride: Keep every ``stride``-th page of the selection
+        
+    Returns:
+        Sorted list of 0-based page indices
+    """
+    if pages:
+        selected = set()
+        for first_page, last_page in parse_page_ranges(pages):
+            last_page = page_count if last_page is None else min(last_page, page_count)
+            selected.update(range(first_page - 1, last_page))
+        indices = sorted(selected)
+    else:
+        indices = list(range(page_count))
+    
+    return indices[::max(stride, 1)]
+
+
 class PDFProcessor:
     """Main PDF processing class that coordinates outline extraction."""
     
-    def __init__(self):
-        """Initialize the PDF processor."""
+    def __init__(self, font_stats: str = 'page', font_sample_pages: int = 32,
+                 toc_policy: str = 'never', min_toc_entries: int = 3,
+                 collect_metrics: bool = False):
+        """
+        Initialize the PDF processor.
+        
+        Args:
+            font_stats: 'page' to compare heading fonts against each page's
+                average size, or 'document' to compare them against a single
+                document-wide body size built in a first pass
+            font_sample_pages: Maximum number of pages sampled by the
+                document-wide first pass (evenly spaced on long documents)
+            toc_policy: When to use the embedded PDF outline (bookmarks)
+                instead of heuristic heading detection: 'never', 'auto'
+                (only if it looks plausible) or 'always' (whenever it has
+                any usable entry)
+            min_toc_entries: Minimum number of usable entries for the
+                embedded outline to be considered plausible in 'auto' mode
+            collect_metrics: Record per-stage timings and counters of each
+                document in ``self.metrics`` (off by default)
+        """
+        if font_stats not in ('page', 'document'):
+            raise ValueError(f"Unknown font_stats mode: {font_stats}")
+        if toc_policy not in TOC_POLICIES:
+            raise ValueError(f"Unknown toc_policy: {toc_policy}")
+        
+        self.font_stats = font_stats
+        self.font_sample_pages = font_sample_pages
+        self.toc_policy = toc_policy
+        self.min_toc_entries = min_toc_entries
+        self.collect_metrics = collect_metrics
         self.outline_extractor = OutlineExtractor()
+        self.schema_validator = SchemaValidator()
+        
+        # Metrics of the document being (or last) processed
+        self.metrics = NULL_METRICS
+        # Error behind the fallback result of the last document, if any
+        self.last_error: Optional[str] = None
+    
+    def cache_config(self) -> Dict[str, Any]:
+        """Return the extractor version and options that affect results."""
+        config = {'version': EXTRACTOR_VERSION, 'font_stats': self.font_stats}
+        if self.font_stats == 'document':
+            config['font_sample_pages'] = self.font_sample_pages
+        if self.toc_policy != 'never':
+            config['toc_policy'] = self.toc_policy
+            config['min_toc_entries'] = self.min_toc_entries
+        return config
     
-    def extract_outline(self, pdf_path: Path) -> Dict[str, Any]:
+    def extract_outline(self, pdf_path: Path, pages: Optional[str] = None,
+                        stride: int = 1) -> Dict[str, Any]:
         """
         Extract structured outline from a PDF file.
         
         Args:
             pdf_path: Path to the PDF file
+            pages: Page ranges to process, e.g. "1-20,35,40-" (1-based,
+                inclusive, open-ended ranges run to the last page);
+                None processes every page
+            stride: Process only every ``stride``-th selected page
+            
+        Returns:
+            Dictionary containing title and outline structure; outline
+            page numbers are always absolute page numbers
+        """
+        pdf_path = Path(pdf_path)
+        return self._extract_outline(lambda: fitz.open(pdf_path), pdf_path.name,
+                                     pages=pages, stride=stride)
+    
+    def extract_outline_from_bytes(self, data: bytes, name: str = "document.pdf",
+                                   pages: Optional[str] = None, stride: int = 1) -> Dict[str, Any]:
+        """
+        Extract structured outline from an in-memory PDF, without touching disk.
+        
+        Args:
+            data: PDF file content (bytes, bytearray or memoryview)
+            name: Document name, used in messages, metrics and the fallback
+                title if the PDF cannot be processed
+            pages: Page ranges to process (see extract_outline)
+            stride: Process only every ``stride``-th selected page
             
         Returns:
             Dictionary containing title and outline structure
         """
-        try:
-            # Open PDF document
-            doc = fitz.open(pdf_path)
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self._extract_outline(lambda: fitz.open(stream=data, filetype="pdf"), name,
+                                     pages=pages, stride=stride)
+    
+    def extract_outline_from_stream(self, stream: BinaryIO, name: Optional[str] = None,
+                                    pages: Optional[str] = None, stride: int = 1) -> Dict[str, Any]:
+        """
+        Extract structured outline from a binary file-like object.
+        
+        Args:
+            stream: Readable binary stream positioned at the start of the PDF
+                (e.g. an uploaded file or io.BytesIO)
+            name: Document name (default: the stream's ``name`` attribute)
+            pages: Page ranges to process (see extract_outline)
+            stride: Process only every ``stride``-th selected page
             
-            # Extract document metadata and content
-            metadata = doc.metadata
-            page_count = len(doc)
+        Returns:
+            Dictionary containing title and outline structure
+        """
+        if name is None:
+            name = Path(str(getattr(stream, 'name', 'document.pdf'))).name
+        return self.extract_outline_from_bytes(stream.read(), name, pages=pages, stride=stride)
+    
+    def _extract_outline(self, open_document: Callable[[], fitz.Document], name: str,
+                         pages: Optional[str] = None, stride: int = 1) -> Dict[str, Any]:
+        """
+        Extract the outline of a document opened by ``open_document``.
+        
+        Args:
+            open_document: Callable returning the opened PyMuPDF document
+            name: Document file name
+            pages: Page ranges to process (see extract_outline)
+            stride: Process only every ``stride``-th selected page
             
-            print(f"  Document info: {page_count} pages")
+        Returns:
+            Dictionary containing title and outline structure
+        """
+        self._start_metrics(name)
+        self.last_error = None
+        
+        try:
+            # Open PDF document
+            with self.metrics.stage('open'):
+                doc = open_document()
             
-            # Extract text content from all pages
-            pages_content = []
-            for page_num in range(page_count):
-                page = doc[page_num]
+            try:
+                # Extract document metadata
+                metadata = doc.metadata
+                page_count = len(doc)
                 
-                # Extract text with font information
-                text_dict = page.get_text("dict")
-                pages_content.append({
-                    'page_num': page_num + 1,
-                    'text_dict': text_dict,
-                    'plain_text': page.get_text()
-                })
-            
-            # Close document
-            doc.close()
-            
-            # Extract title and outline using the specialized extractor
-            title = self.outline_extractor.extract_title(metadata, pages_content)
-            outline = self.outline_extractor.extract_headings(pages_content)
+                page_indices = select_pages(page_count, pages, stride)
+                
+                if len(page_indices) == page_count:
+                    print(f"  Document info: {page_count} pages")
+                else:
+                    print(f"  Document info: {page_count} pages, processing {len(page_indices)}")
+                
+                # Fast path: trust the embedded outline and skip text extraction
+                toc_outline = self._outline_from_toc(doc)
+                if toc_outline is not None and pages:
+                    in_range = set(select_pages(page_count, pages))
+                    toc_outline = [item for item in toc_outline if item['page'] - 1 in in_range]
+                    # No embedded entry in the selected pages: detect
+                    # headings there instead of returning an empty outline
+                    if not toc_outline:
+                        toc_outline = None
+                if toc_outline is not None:
+                    print(f"  Using embedded outline: {len(toc_outline)} headings")
+                    return {
+                        "title": self._extract_title_from_document(doc, max_pages=1),
+                        "outline": toc_outline
+                    }
+                
+                # Pages extracted ahead of the streaming pass, by page index
+                extracted = {}
+                
+                body_size = None
+                if self.font_stats == 'document':
+                    body_size = self._build_document_font_stats(doc, extracted, page_indices)
+                
+                # The title only needs the first page; if it is processed
+                # anyway, keep it for the streaming pass so it is not
+                # parsed twice
+                if page_indices and page_indices[0] == 0:
+                    if 0 not in extracted:
+                        extracted[0] = self._extract_page_content(doc[0], 1)
+                    title = self.outline_extractor.extract_title(metadata, [extracted[0]])
+                else:
+                    title = self._extract_title_from_document(doc, max_pages=1)
+                
+                # Stream pages through the extractor one at a time
+                outline = self.outline_extractor.extract_headings(
+                    self._iter_page_contents(doc, extracted, page_indices), body_size=body_size
+                )
+            finally:
+                doc.close()
             
             return {
                 "title": title,
                 "outline": outline
             }
             
+        except MemoryError:
+            # Out of memory budget: let the caller record a failure rather
+            # than emitting an empty outline
+            raise
         except Exception as e:
-            print(f"Error processing PDF {pdf_path}: {str(e)}")
+            print(f"Error processing PDF {name}: {str(e)}")
+            self.last_error = str(e)
             # Return default structure on error
             return {
-                "title": pdf_path.stem.replace('_', ' ').title(),
+                "title": Path(name).stem.replace('_', ' ').title(),
                 "outline": []
             }
     
-    def save_result(self, result: Dict[str, Any], output_path: Path) -> None:
+    def _start_metrics(self, name: str) -> None:
+        """Start a fresh metrics record for a document, if enabled."""
+        self.metrics = DocumentMetrics(name) if self.collect_metrics else NULL_METRICS
+        self.outline_extractor.metrics = self.metrics
+    
+    def extract_title(self, pdf_path: Path, max_pages: int = 1) -> str:
+        """
+        Extract only the title of a PDF file, without full outline extraction.
+        
+        The document metadata is checked first; only if it has no usable
+        title are the first ``max_pages`` pages parsed, one at a time, until
+        a title candidate is found.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            max_pages: Maximum number of leading pages to inspect
+            
+        Returns:
+            Extracted title string
+        """
+        try:
+            with fitz.open(pdf_path) as doc:
+                return self._extract_title_from_document(doc, max_pages)
+        except Exception as e:
+            print(f"Error processing PDF {pdf_path}: {str(e)}")
+            return pdf_path.stem.replace('_', ' ').title()
+    
+    def _extract_title_from_document(self, doc: fitz.Document, max_pages: int) -> str:
+        """Extract the title from metadata or, lazily, the first max_pages pages."""
+        page_limit = min(len(doc), max(max_pages, 0))
+        leading_pages = (self._extract_page_content(doc[page_num], page_num + 1)
+                         for page_num in range(page_limit))
+        return self.outline_extractor.extract_title(doc.metadata, leading_pages)
+    
+    def _outline_from_toc(self, doc: fitz.Document) -> Optional[List[Dict[str, Any]]]:
+        """
+        Map the embedded PDF outline (bookmarks) to the H1/H2/H3 schema.
+        
+        Entries deeper than level 3, without text or pointing outside the
+        document are dropped. In 'auto' mode the outline is only trusted if
+        at least ``min_toc_entries`` entries remain, it starts at level 1
+        and the original tree has no level jumps.
+        
+        Args:
+            doc: Open PyMuPDF document
+            
+        Returns:
+            Outline list, or None if the heuristic extractor should run
+        """
+        if self.toc_policy == 'never':
+            return None
+        
+        toc = doc.get_toc(simple=True)
+        if not toc:
+            return None
+        
+        page_count = len(doc)
+        outline = []
+        previous_level = 0
+        well_formed = toc[0][0] == 1
+        
+        for level, text, page in toc:
+            if level > previous_level + 1:
+                well_formed = False
+            previous_level = level
+            
+            text = ' '.join(text.split())
+            if level > 3 or not text or not 1 <= page <= page_count:
+                continue
+            
+            outline.append({
+                'level': f'H{level}',
+                'text': text,
+                'page': page
+            })
+        
+        if not outline:
+            return None
+        if self.toc_policy == 'auto' and (not well_formed or len(outline) < self.min_toc_entries):
+            return None
+        
+        return outline
+    
+    def _build_document_font_stats(self, doc: fitz.Document,
+                                   extracted: Dict[int, Dict[str, Any]],
+                                   page_indices: Optional[List[int]] = None) -> Optional[float]:
+        """
+        First pass of the document-wide font statistics mode.
+        
+        Builds a character-weighted font size histogram over all processed
+        pages, or over ``font_sample_pages`` evenly spaced ones on longer
+        documents. Sampled pages are stored in ``extracted`` so the
+        streaming pass reuses them instead of parsing them again.
+        
+        Args:
+            doc: Open PyMuPDF document
+            extracted: Dictionary of pre-extracted pages, filled in place
+            page_indices: 0-based indices of the processed pages (default: all)
+            
+        Returns:
+            Document body font size, or None if the document has no text
+        """
+        if page_indices is None:
+            page_indices = list(range(len(doc)))
+        
+        sample_count = min(len(page_indices), max(self.font_sample_pages, 1))
+        if not sample_count:
+            return None
+        
+        step = len(page_indices) / sample_count
+        sample_indices = sorted({page_indices[int(i * step)] for i in range(sample_count)})
+        
+        font_analyzer = self.outline_extractor.font_analyzer
+        histogram = {}
+        for page_index in sample_indices:
+            page_content = self._extract_page_content(doc[page_index], page_index + 1)
+            font_analyzer.accumulate_size_histogram(page_content['spans'], histogram)
+            extracted[page_index] = page_content
+        
+        return font_analyzer.get_body_font_size(histogram)
+    
+    def _iter_page_contents(self, doc: fitz.Document,
+                            extracted: Optional[Dict[int, Dict[str, Any]]] = None,
+                            page_indices: Optional[List[int]] = None
+                            ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield page content dictionaries one page at a time.
+        
+        Only the page currently being scanned is held in memory, so peak
+        memory does not grow with the number of pages in the document.
+        
+        Args:
+            doc: Open PyMuPDF document
+            extracted: Already extracted pages by page index; consumed
+                (and released) as the stream reaches them
+            page_indices: 0-based indices of the pages to yield (default: all)
+            
+        Yields:
+            Page content dictionaries in page order
+        """
+        extracted = extracted if extracted is not None else {}
+        if page_indices is None:
+            page_indices = range(len(doc))
+        
+        for page_num in page_indices:
+            page_content = extracted.pop(page_num, None)
+            if page_content is None:
+                page = doc[page_num]
+                page_content = self._extract_page_content(page, page_num + 1)
+                page = None
+            yield page_content
+    
+    def _extract_page_content(self, page: fitz.Page, page_num: int) -> Dict[str, Any]:
+        """
+        Extract font information and plain text from a page in a single pass.
+        
+        The content stream is parsed once with image blocks disabled and
+        packed into a compact SpanTable; its text buffer doubles as the
+        plain text used for pattern matching.
+        
+        Args:
+            page: PyMuPDF page object
+            page_num: 1-based page number
+            
+        Returns:
+            Page content dictionary with the page height, span table and plain text
+        """
+        metrics = self.metrics
+        with metrics.stage('get_text'):
+            text_dict = page.get_text("dict", flags=TEXT_EXTRACTION_FLAGS)
+            spans = SpanTable.from_text_dict(text_dict)
+        metrics.count('pages')
+        metrics.count('spans', spans.span_count)
+        
+        return {
+            'page_num': page_num,
+            'height': page.rect.height,
+            'spans': spans,
+            'plain_text': spans.text
+        }
+    
+    def save_result(self, result: Dict[str, Any], output_path: Path,
+                    compact: bool = False) -> bool:
         """
         Save the extraction result to a JSON file with validation.
         
+        The file is written atomically (temporary file + rename), so
+        concurrent readers never see a partial result.
+        
         Args:
             result: The extraction result dictionary
             output_path: Path where to save the JSON file
+            compact: Write without indentation
+            
+        Returns:
+            True if the result passed schema validation
         """
         try:
             # Validate the result against schema before saving
-            is_valid, errors = self._validate_result(result)
-            
-            if not is_valid:
-                print(f"  {colored_text('Schema validation warnings', '33')} for {output_path.name}:")
-                for error in errors[:3]:  # Show first 3 errors
-                    print(f"     - {error}")
-                if len(errors) > 3:
-                    print(f"     ... and {len(errors) - 3} more warning(s)")
+            is_valid = self.check_result(result, output_path.name)
             
             # Save the JSON file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            with self.metrics.stage('save'):
+                write_json(output_path, result, compact=compact)
                 
             if is_valid:
                 print(f"  {colored_text('Schema validation passed', '32')}")
+            return is_valid
             
         except Exception as e:
             print(f"Error saving result to {output_path}: {str(e)}")
             raise
     
+    def check_result(self, result: Dict[str, Any], name: str) -> bool:
+        """
+        Validate a result and print any schema warnings.
+        
+        Args:
+            result: The extraction result dictionary
+            name: Name used in the warning message
+            
+        Returns:
+            True if the result is valid
+        """
+        is_valid, errors = self._validate_result(result)
+        
+        if not is_valid:
+            print(f"  {colored_text('Schema validation warnings', '33')} for {name}:")
+            for error in errors[:3]:  # Show first 3 errors
+                print(f"     - {error}")
+            if len(errors) > 3:
+                print(f"     ... and {len(errors) - 3} more warning(s)")
+        
+        return is_valid
+    
     def _validate_result(self, result: Dict[str, Any]) -> tuple:
         """
         Validate result against Challenge 1A schema.
         
+        The result is checked in memory with the shared compiled schema
+        validator plus the custom checks of SchemaValidator.
+        
         Args:
             result: The result dictionary to validate
             
         Returns:
             Tuple of (is_valid, error_list)
         """
-        errors = []
-        
-        # Check title
-        title = result.get('title', '')
-        if not title or not isinstance(title, str) or len(title.strip()) < 3:
-            errors.append("Title must be a non-empty string with at least 3 characters")
-        
-        # Check outline
-        outline = result.get('outline', [])
-        if not isinstance(outline, list):
-            errors.append("Outline must be an array")
-        else:
-            for i, item in enumerate(outline):
-                if not isinstance(item, dict):
-                    errors.append(f"Outline item {i} must be an object")
-                    continue
-                
-                # Check required fields
-                level = item.get('level', '')
-                text = item.get('text', '')
-                page = item.get('page')
-                
-                if level not in ['H1', 'H2', 'H3']:
-                    errors.append(f"Item {i}: level must be H1, H2, or H3")
-                
-                if not text or not isinstance(text, str):
-                    errors.append(f"Item {i}: text must be a non-empty string")
-                
-                if not isinstance(page, int) or page < 1:
-                    errors.append(f"Item {i}: page must be a positive integer")
+        return self.schema_validator.validate_data(result)
+
+
+# Warm processors reused by the module-level API, per thread and options
+# (a PDFProcessor keeps per-document state while it runs)
+_shared_processors = threading.local()
+
+
+def get_processor(**options: Any) -> PDFProcessor:
+    """
+    Return a warm PDFProcessor for the calling thread.
+    
+    Processors are created once per thread and option set, so compiled
+    patterns and the schema validator are reused across calls.
+    
+    Args:
+        **options: PDFProcessor keyword arguments
+        
+    Returns:
+        Shared PDFProcessor instance
+    """
+    processors = getattr(_shared_processors, 'by_options', None)
+    if processors is None:
+        processors = _shared_processors.by_options = {}
+    
+    key = tuple(sorted(options.items()))
+    processor = processors.get(key)
+    if processor is None:
+        processor = processors[key] = PDFProcessor(**options)
+    return processor
+
+
+def extract_outline_from_bytes(data: bytes, name: str = "document.pdf",
+                               pages: Optional[str] = None, stride: int = 1,
+                               **options: Any) -> Dict[str, Any]:
+    """
+    Extract the outline of an in-memory PDF with a warm shared processor.
+    
+    Args:
+        data: PDF file content
+        name: Document name (see PDFProcessor.extract_outline_from_bytes)
+        pages: Page ranges to process
+        stride: Process only every ``stride``-th selected page
+        **options: PDFProcessor keyword arguments
+        
+    Returns:
+        Dictionary containing title and outline structure
+    """
+    return get_processor(**options).extract_outline_from_bytes(data, name, pages=pages, stride=stride)
+
+
+def extract_outline_from_stream(stream: BinaryIO, name: Optional[str] = None,
+                                pages: Optional[str] = None, stride: int = 1,
+                                **options: Any) -> Dict[str, Any]:
+    """
+    Extract the outline of a binary stream with a warm shared processor.
+    
+    Args:
+        stream: Readable binary stream containing the PDF
+        name: Document name (default: the stream's ``name`` attribute)
+        pages: Page ranges to process
+        stride: Process only every ``stride``-th selected page
+        **options: PDFProcessor keyword arguments
         
-        return len(errors) == 0, errors
+    Returns:
+        Dictionary containing title and outline structure
+    """
+    return get_processor(**options).extract_outline_from_stream(stream, name, pages=pages, stride=stride)
@@ -0,0 +1,145 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Result Cache - Content-addressed on-disk cache of outline extraction results
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+from json_writer import write_json
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache directory ($XDG_CACHE_HOME or ~/.cache, outside any output dir)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'pdf-outline-extractor'
+
+
+class ResultCache:
+    """
+    On-disk cache of extraction results keyed by PDF content and config.
+
+    Entries are JSON files named by a SHA-256 key derived from the PDF's
+    content hash and the extractor version/configuration, so renamed or
+    copied files still hit and any extractor change invalidates old entries.
+    The cache is bounded in size; least recently used entries (by file
+    modification time, refreshed on every hit) are evicted first.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Maximum total size of the cache entries
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """
+        Compute the SHA-256 hash of a file's content.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Read size in bytes
+
+        Returns:
+            Hex digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, config: Dict[str, Any]) -> str:
+        """
+        Build the cache key for a document and extractor configuration.
+
+        Args:
+            content_hash: SHA-256 hex digest of the PDF content
+            config: Extractor version and options affecting the result
+
+        Returns:
+            Cache key
+        """
+        payload = content_hash + json.dumps(config, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Return the path of a cache entry."""
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            The cached result dictionary, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            # Refresh the entry's position in the LRU order
+            os.utime(entry_path)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result in the cache.
+
+        The entry is written to a temporary file and renamed into place,
+        so concurrent workers never observe partial entries.
+
+        Args:
+            key: Cache key from make_key
+            result: Extraction result dictionary
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_json(self._entry_path(key), result, compact=True)
+
+    def prune(self) -> int:
+        """
+        Evict least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of evicted entries
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        entries = []
+        total_bytes = 0
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_bytes += stat.st_size
+
+        evicted = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total_bytes -= size
+            evicted += 1
+
+        return evicted
@@ -6,54 +6,71 @@ Schema Validator - Validates output JSON against the official schema
 import json
 import jsonschema
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 def colored_text(text: str, color_code: str) -> str:
     """Return colored text for terminal output."""
     return f"\033[{color_code}m{text}\033[0m"
 
 
+# Official schema from the hackathon
+OFFICIAL_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-04/schema#",
+    "type": "object",
+    "properties": {
+        "title": {
+            "type": "string"
+        },
+        "outline": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "level": {
+                        "type": "string"
+                    },
+                    "text": {
+                        "type": "string"
+                    },
+                    "page": {
+                        "type": "integer"
+                    }
+                },
+                "required": [
+                    "level",
+                    "text",
+                    "page"
+                ]
+            }
+        }
+    },
+    "required": [
+        "title",
+        "outline"
+    ]
+}
+
+# Compiled validator shared by all SchemaValidator instances
+_compiled_validator = None
+
+
+def _get_compiled_validator():
+    """Return the compiled official schema validator, building it on first use."""
+    global _compiled_validator
+    if _compiled_validator is None:
+        validator_class = jsonschema.validators.validator_for(OFFICIAL_SCHEMA)
+        validator_class.check_schema(OFFICIAL_SCHEMA)
+        _compiled_validator = validator_class(OFFICIAL_SCHEMA)
+    return _compiled_validator
+
+
 class SchemaValidator:
     """Validates Challenge 1A output against the official schema."""
     
     def __init__(self):
         """Initialize the schema validator."""
-        # Official schema from the hackathon
-        self.official_schema = {
-            "$schema": "http://json-schema.org/draft-04/schema#",
-            "type": "object",
-            "properties": {
-                "title": {
-                    "type": "string"
-                },
-                "outline": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "level": {
-                                "type": "string"
-                            },
-                            "text": {
-                                "type": "string"
-                            },
-                            "page": {
-                                "type": "integer"
-                            }
-                        },
-                        "required": [
-                            "level",
-                            "text",
-                            "page"
-                        ]
-                    }
-                }
-            },
-            "required": [
-                "title",
-                "outline"
-            ]
-        }
+        self.official_schema = OFFICIAL_SCHEMA
+        self.validator = _get_compiled_validator()
     
     def validate_json_file(self, json_path: Path) -> Tuple[bool, List[str]]:
         """
@@ -90,7 +107,9 @@ class SchemaValidator:
         
         try:
             # Basic schema validation
-            jsonschema.validate(data, self.official_schema)
+            schema_error = jsonschema.exceptions.best_match(self.validator.iter_errors(data))
+            if schema_error is not None:
+                raise schema_error
             
             # Additional custom validations
             custom_errors = self._custom_validations(data)
@@ -169,41 +188,67 @@ class SchemaValidator:
         Returns:
             Formatted validation report string
         """
-        is_valid, errors = self.validate_json_file(json_path)
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            return self.format_report(json_path.name, None, [f"Invalid JSON format: {str(e)}"])
+        except Exception as e:
+            return self.format_report(json_path.name, None, [f"Error reading file: {str(e)}"])
+        
+        return self.get_data_report(data, json_path.name)
+    
+    def get_data_report(self, data: Dict[str, Any], name: str) -> str:
+        """
+        Get a detailed validation report for an in-memory result.
+        
+        Args:
+            data: Dictionary containing the JSON data
+            name: Name shown in the report header
+            
+        Returns:
+            Formatted validation report string
+        """
+        is_valid, errors = self.validate_data(data)
+        return self.format_report(name, data if is_valid else None, errors)
+    
+    def format_report(self, name: str, data: Optional[Dict[str, Any]], errors: List[str]) -> str:
+        """
+        Format a validation report.
         
-        report = f"{colored_text('SCHEMA VALIDATION REPORT', '36')} for: {json_path.name}\n"
+        Args:
+            name: Name shown in the report header
+            data: The validated data if it passed validation, else None
+            errors: Validation errors
+            
+        Returns:
+            Formatted validation report string
+        """
+        report = f"{colored_text('SCHEMA VALIDATION REPORT', '36')} for: {name}\n"
         report += "=" * 60 + "\n\n"
         
-        if is_valid:
+        if data is not None and not errors:
             report += f"{colored_text('VALIDATION PASSED', '32')}\n"
             report += "The JSON file conforms to the official Challenge 1A schema.\n"
             
-            # Load and show basic stats
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                outline = data.get('outline', [])
-                level_counts = {}
-                for item in outline:
-                    level = item.get('level', 'Unknown')
-                    level_counts[level] = level_counts.get(level, 0) + 1
-                
-                report += f"\n{colored_text('Statistics:', '34')}\n"
-                report += f"   Title: {data.get('title', 'N/A')}\n"
-                report += f"   Total headings: {len(outline)}\n"
-                
-                for level in ['H1', 'H2', 'H3']:
-                    count = level_counts.get(level, 0)
-                    if count > 0:
-                        report += f"   {level} headings: {count}\n"
-                
-                if outline:
-                    pages = [item.get('page', 0) for item in outline]
-                    report += f"   Page range: {min(pages)} - {max(pages)}\n"
-                
-            except Exception as e:
-                report += f"Note: Could not load statistics - {str(e)}\n"
+            outline = data.get('outline', [])
+            level_counts = {}
+            for item in outline:
+                level = item.get('level', 'Unknown')
+                level_counts[level] = level_counts.get(level, 0) + 1
+            
+            report += f"\n{colored_text('Statistics:', '34')}\n"
+            report += f"   Title: {data.get('title', 'N/A')}\n"
+            report += f"   Total headings: {len(outline)}\n"
+            
+            for level in ['H1', 'H2', 'H3']:
+                count = level_counts.get(level, 0)
+                if count > 0:
+                    report += f"   {level} headings: {count}\n"
+            
+            if outline:
+                pages = [item.get('page', 0) for item in outline]
+                report += f"   Page range: {min(pages)} - {max(pages)}\n"
         
         else:
             report += f"{colored_text('VALIDATION FAILED', '31')}\n"
@@ -231,14 +276,26 @@ def validate_output_directory(output_dir: Path) -> None:
         print("No JSON files found in output directory.")
         return
     
-    print(f"{colored_text('Validating', '36')} {len(json_files)} JSON file(s)...")
+    print_validation_summary((json_file.name, validator.validate_json_file(json_file))
+                             for json_file in json_files)
+
+
+def print_validation_summary(outcomes: Iterable[Tuple[str, Tuple[bool, List[str]]]]) -> None:
+    """
+    Print per-file validation outcomes and the summary.
+    
+    Args:
+        outcomes: (name, (is_valid, errors)) pairs
+    """
+    outcomes = list(outcomes)
+    
+    print(f"{colored_text('Validating', '36')} {len(outcomes)} JSON file(s)...")
     print("=" * 70)
     
     valid_count = 0
     
-    for json_file in json_files:
-        print(f"\n{colored_text('Checking:', '34')} {json_file.name}")
-        is_valid, errors = validator.validate_json_file(json_file)
+    for name, (is_valid, errors) in outcomes:
+        print(f"\n{colored_text('Checking:', '34')} {name}")
         
         if is_valid:
             print(f"   {colored_text('Valid', '32')}")
@@ -251,12 +308,12 @@ def validate_output_directory(output_dir: Path) -> None:
                 print(f"      ... and {len(errors) - 3} more error(s)")
     
     print(f"\n{'='*70}")
-    print(f"{colored_text('Summary:', '34')} {valid_count}/{len(json_files)} files passed validation")
+    print(f"{colored_text('Summary:', '34')} {valid_count}/{len(outcomes)} files passed validation")
     
-    if valid_count == len(json_files):
+    if valid_count == len(outcomes):
         print(f"{colored_text('All files conform to the official schema!', '32')}")
     else:
-        print(f"{colored_text(f'{len(json_files) - valid_count} file(s) need fixing', '33')}")
+        print(f"{colored_text(f'{len(outcomes) - valid_count} file(s) need fixing', '33')}")
 
 
 if __name__ == "__main__":
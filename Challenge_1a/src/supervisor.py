@@ -0,0 +1,133 @@
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Supervisor - Runs each document in a child process with time and memory limits
+"""
+
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def _address_space_bytes() -> int:
+    """Return the current virtual memory size of this process (0 if unknown)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _run_child(conn, initializer: Callable, initargs: tuple, target: Callable, args: tuple,
+               max_memory_bytes: Optional[int]) -> None:
+    """Child process body: apply the memory limit, run the task, send back its record."""
+    try:
+        if max_memory_bytes and resource is not None:
+            # Budget on top of what the interpreter and libraries already map
+            limit = _address_space_bytes() + max_memory_bytes
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        initializer(*initargs)
+        conn.send(target(*args))
+    except BaseException as e:
+        try:
+            conn.send({'error': f"{type(e).__name__}: {str(e)}"})
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+
+def _failure(pdf_file: Path, seconds: float, message: str) -> Dict[str, Any]:
+    """Build the result record of a document that exceeded its limits or crashed."""
+    print(f"✗ Error processing {pdf_file.name}: {message}")
+    return {
+        'file': pdf_file.name,
+        'status': 'error',
+        'seconds': seconds,
+        'headings': 0,
+        'error': message
+    }
+
+
+def run_supervised(tasks: Sequence[Tuple[Path, tuple]], target: Callable, initializer: Callable,
+                   initargs: tuple = (), workers: int = 1, timeout: Optional[float] = None,
+                   max_memory_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run one child process per document, at most ``workers`` at a time.
+
+    A child that runs longer than ``timeout`` seconds is killed; a child
+    whose allocations exceed ``max_memory_bytes`` fails inside MuPDF or
+    Python, or dies. Either way the document is recorded as an error and
+    the rest of the batch carries on.
+
+    Args:
+        tasks: (pdf_file, target arguments) pairs, started in order
+        target: Function run in the child; must return a result record
+        initializer: Function run in the child before ``target``
+        initargs: Arguments for ``initializer``
+        workers: Maximum number of concurrent children
+        timeout: Wall-time limit per document in seconds (None = unlimited)
+        max_memory_bytes: Address space budget per document on top of the
+            child's baseline (None = unlimited; needs the resource module)
+
+    Returns:
+        Result records, in completion order
+    """
+    context = multiprocessing.get_context()
+    pending = list(reversed(tasks))
+    active = {}  # connection -> (process, pdf_file, start_time)
+    results = []
+
+    while pending or active:
+        while pending and len(active) < max(workers, 1):
+            pdf_file, args = pending.pop()
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(target=_run_child, daemon=True,
+                                      args=(child_conn, initializer, initargs, target, args,
+                                            max_memory_bytes))
+            process.start()
+            child_conn.close()
+            active[parent_conn] = (process, pdf_file, time.perf_counter())
+
+        wait_time = None
+        if timeout is not None:
+            now = time.perf_counter()
+            wait_time = max(0.0, min(start + timeout for _, _, start in active.values()) - now)
+
+        for conn in wait(list(active), timeout=wait_time):
+            process, pdf_file, start_time = active.pop(conn)
+            try:
+                record = conn.recv()
+            except (EOFError, OSError):
+                record = None
+            conn.close()
+            process.join()
+
+            seconds = time.perf_counter() - start_time
+            if record is None:
+                results.append(_failure(pdf_file, seconds,
+                                        f"Worker process died (exit code {process.exitcode})"))
+            elif 'file' not in record:
+                results.append(_failure(pdf_file, seconds, record.get('error', 'Unknown error')))
+            else:
+                results.append(record)
+
+        if timeout is not None:
+            now = time.perf_counter()
+            for conn, (process, pdf_file, start_time) in list(active.items()):
+                if now - start_time >= timeout:
+                    process.kill()
+                    process.join()
+                    conn.close()
+                    del active[conn]
+                    results.append(_failure(pdf_file, now - start_time,
+                                            f"Timed out after {timeout:g} seconds"))
+
+    return results
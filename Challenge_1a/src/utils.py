@@ -4,7 +4,225 @@ Utility Classes - Font analysis and text processing utilities
 """
 
 import re
-from typing import Dict, List, Any, Set
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+
+class SpanTable:
+    """
+    Compact per-page span table built once from PyMuPDF "dict" output.
+    
+    Spans are stored column-wise in parallel typed arrays instead of nested
+    blocks -> lines -> spans dictionaries, so font statistics reduce over
+    flat arrays. Span texts live in a single page text buffer (lines joined
+    by newlines) and are addressed by offsets; the buffer doubles as the
+    page's plain text.
+    """
+    
+    __slots__ = (
+        'sizes', 'flags', 'font_ids', 'x0', 'y0', 'x1', 'y1',
+        'span_line', 'text_start', 'text_end', 'fonts',
+        'line_span_start', 'line_span_end', 'line_size', 'line_flags',
+        'line_y0', 'line_y1', 'line_text_start', 'line_text_end', 'text'
+    )
+    
+    def __init__(self):
+        """Initialize an empty span table."""
+        # Span columns
+        self.sizes = array('d')
+        self.flags = array('i')
+        self.font_ids = array('i')
+        self.x0 = array('d')
+        self.y0 = array('d')
+        self.x1 = array('d')
+        self.y1 = array('d')
+        self.span_line = array('i')
+        self.text_start = array('i')
+        self.text_end = array('i')
+        self.fonts: List[str] = []
+        
+        # Line columns (spans of a line are contiguous)
+        self.line_span_start = array('i')
+        self.line_span_end = array('i')
+        self.line_size = array('d')
+        self.line_flags = array('i')
+        self.line_y0 = array('d')
+        self.line_y1 = array('d')
+        self.line_text_start = array('i')
+        self.line_text_end = array('i')
+        
+        self.text = ''
+    
+    @classmethod
+    def from_text_dict(cls, text_dict: Dict) -> 'SpanTable':
+        """
+        Build a span table from a PyMuPDF text dictionary.
+        
+        Args:
+            text_dict: Output of page.get_text("dict")
+            
+        Returns:
+            Populated SpanTable
+        """
+        table = cls()
+        font_index: Dict[str, int] = {}
+        pieces: List[str] = []
+        offset = 0
+        
+        for block in text_dict.get('blocks', []):
+            if 'lines' not in block:
+                continue
+            
+            for line in block['lines']:
+                line_id = len(table.line_span_start)
+                if line_id:
+                    # Newline separating this line from the previous one
+                    pieces.append('\n')
+                    offset += 1
+                
+                line_bbox = line.get('bbox', (0, 0, 0, 0))
+                table.line_y0.append(line_bbox[1])
+                table.line_y1.append(line_bbox[3])
+                table.line_span_start.append(len(table.sizes))
+                table.line_text_start.append(offset)
+                line_size = 0
+                line_flags = 0
+                
+                for span in line.get('spans', []):
+                    text = span.get('text', '')
+                    size = span.get('size', 0)
+                    flags = span.get('flags', 0)
+                    font = span.get('font', 'default')
+                    bbox = span.get('bbox', (0, 0, 0, 0))
+                    
+                    font_id = font_index.get(font)
+                    if font_id is None:
+                        font_id = font_index[font] = len(table.fonts)
+                        table.fonts.append(font)
+                    
+                    table.sizes.append(size)
+                    table.flags.append(flags)
+                    table.font_ids.append(font_id)
+                    table.x0.append(bbox[0])
+                    table.y0.append(bbox[1])
+                    table.x1.append(bbox[2])
+                    table.y1.append(bbox[3])
+                    table.span_line.append(line_id)
+                    table.text_start.append(offset)
+                    pieces.append(text)
+                    offset += len(text)
+                    table.text_end.append(offset)
+                    
+                    line_size = max(line_size, size)
+                    line_flags |= flags
+                
+                table.line_span_end.append(len(table.sizes))
+                table.line_text_end.append(offset)
+                table.line_size.append(line_size)
+                table.line_flags.append(line_flags)
+        
+        table.text = ''.join(pieces)
+        return table
+    
+    @property
+    def span_count(self) -> int:
+        """Number of spans in the table."""
+        return len(self.sizes)
+    
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the table."""
+        return len(self.line_span_start)
+    
+    def span_text(self, index: int) -> str:
+        """Return the text of a span."""
+        return self.text[self.text_start[index]:self.text_end[index]]
+    
+    def line_text(self, index: int) -> str:
+        """Return the text of a line (all of its spans concatenated)."""
+        return self.text[self.line_text_start[index]:self.line_text_end[index]]
+    
+    def iter_spans(self) -> Iterator[Tuple[str, float, int]]:
+        """Yield (text, size, flags) for every span."""
+        text = self.text
+        for start, end, size, flags in zip(self.text_start, self.text_end,
+                                           self.sizes, self.flags):
+            yield text[start:end], size, flags
+    
+    def iter_lines(self) -> Iterator[Tuple[str, float, int]]:
+        """Yield (text, max span size, OR of span flags) for every line."""
+        text = self.text
+        for start, end, size, flags in zip(self.line_text_start, self.line_text_end,
+                                           self.line_size, self.line_flags):
+            yield text[start:end], size, flags
+
+
+class RunningTextIndex:
+    """
+    Bounded hashed index of lines repeated at the same vertical position.
+    
+    Running headers and footers (document titles, "Page 3 of 12", dates)
+    repeat with the same text at the same height on many pages. Each line
+    is reduced to a hash of its normalized text (lowercase, collapsed
+    whitespace, digit runs replaced by '#') and its vertical position
+    bucket; the index counts the distinct pages each key appears on. It
+    holds at most ``max_entries`` keys and evicts the least recently seen.
+    
+    Eviction forgets a key's earlier occurrences: if more than
+    ``max_entries`` other distinct lines are seen between two pages
+    carrying the same running header or footer (very text-dense pages, or
+    a header that only recurs far apart), its page count starts over and
+    the line can be reported as a heading again.
+    """
+    
+    _DIGITS = re.compile(r'\d+')
+    
+    def __init__(self, min_pages: int = 3, position_step: float = 2.0,
+                 max_entries: int = 4096):
+        """
+        Initialize the index.
+        
+        Args:
+            min_pages: Number of distinct pages after which a key counts
+                as running text
+            position_step: Vertical position bucket size in points
+            max_entries: Maximum number of keys kept in the index
+        """
+        self.min_pages = min_pages
+        self.position_step = position_step
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> [last_page, page_count]
+    
+    def make_key(self, text: str, y: float) -> int:
+        """Return the index key of a line's text at vertical position y."""
+        normalized = self._DIGITS.sub('#', ' '.join(text.lower().split()))
+        return hash((normalized, round(y / self.position_step)))
+    
+    def add(self, key: int, page: int) -> bool:
+        """
+        Record that a key occurs on a page.
+        
+        Returns:
+            True if the key now counts as running text
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [page, 1]
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+            if entry[0] != page:
+                entry[0] = page
+                entry[1] += 1
+        
+        return entry[1] >= self.min_pages
+    
+    def is_repeated(self, key: Optional[int]) -> bool:
+        """Return True if the key counts as running text."""
+        entry = self._entries.get(key) if key is not None else None
+        return entry is not None and entry[1] >= self.min_pages
 
 
 class FontAnalyzer:
@@ -14,45 +232,91 @@ class FontAnalyzer:
         """Initialize font analyzer."""
         self.font_cache = {}
     
-    def analyze_font_distribution(self, text_dict: Dict) -> Dict[str, Any]:
+    def analyze_font_distribution(self, spans: Any) -> Dict[str, Any]:
         """
         Analyze the distribution of fonts in a document.
         
         Args:
-            text_dict: PyMuPDF text dictionary
+            spans: SpanTable, or a PyMuPDF text dictionary
             
         Returns:
             Dictionary with font analysis results
         """
-        font_sizes = []
-        font_names = []
-        font_flags = []
+        if not isinstance(spans, SpanTable):
+            if 'blocks' not in spans:
+                return {'sizes': [], 'names': [], 'flags': []}
+            spans = SpanTable.from_text_dict(spans)
         
-        if 'blocks' not in text_dict:
-            return {'sizes': [], 'names': [], 'flags': []}
-        
-        for block in text_dict['blocks']:
-            if 'lines' not in block:
-                continue
-                
-            for line in block['lines']:
-                if 'spans' not in line:
-                    continue
-                    
-                for span in line['spans']:
-                    font_sizes.append(span.get('size', 12))
-                    font_names.append(span.get('font', 'default'))
-                    font_flags.append(span.get('flags', 0))
+        font_sizes = spans.sizes.tolist()
+        font_names = [spans.fonts[font_id] for font_id in spans.font_ids]
+        font_flags = spans.flags.tolist()
         
         return {
             'sizes': font_sizes,
             'names': font_names,
             'flags': font_flags,
-            'avg_size': sum(font_sizes) / len(font_sizes) if font_sizes else 12,
-            'max_size': max(font_sizes) if font_sizes else 12,
-            'min_size': min(font_sizes) if font_sizes else 12
+            'avg_size': sum(spans.sizes) / len(spans.sizes) if font_sizes else 12,
+            'max_size': max(spans.sizes) if font_sizes else 12,
+            'min_size': min(spans.sizes) if font_sizes else 12
         }
     
+    def size_statistics(self, spans: SpanTable) -> Tuple[float, float]:
+        """
+        Compute average and maximum of the positive span font sizes.
+        
+        Args:
+            spans: SpanTable of a page
+            
+        Returns:
+            Tuple of (avg_size, max_size), or (0, 0) if the page has no sizes
+        """
+        sizes = spans.sizes
+        if not sizes:
+            return 0.0, 0.0
+        if min(sizes) > 0:
+            return sum(sizes) / len(sizes), max(sizes)
+        
+        positive = [size for size in sizes if size > 0]
+        if not positive:
+            return 0.0, 0.0
+        return sum(positive) / len(positive), max(positive)
+    
+    def accumulate_size_histogram(self, spans: SpanTable,
+                                  histogram: Optional[Dict[float, int]] = None) -> Dict[float, int]:
+        """
+        Add a page's spans to a character-weighted font size histogram.
+        
+        Args:
+            spans: SpanTable of a page
+            histogram: Existing histogram to update, or None to start one
+            
+        Returns:
+            Histogram mapping rounded font size to character count
+        """
+        if histogram is None:
+            histogram = {}
+        
+        for size, start, end in zip(spans.sizes, spans.text_start, spans.text_end):
+            if size > 0 and end > start:
+                size = round(size, 2)
+                histogram[size] = histogram.get(size, 0) + (end - start)
+        
+        return histogram
+    
+    def get_body_font_size(self, histogram: Dict[float, int]) -> Optional[float]:
+        """
+        Return the body font size of a document.
+        
+        Args:
+            histogram: Character-weighted font size histogram
+            
+        Returns:
+            The size carrying the most characters, or None if empty
+        """
+        if not histogram:
+            return None
+        return max(histogram.items(), key=lambda item: (item[1], -item[0]))[0]
+    
     def is_heading_font(self, font_size: float, font_flags: int, 
                        avg_size: float, threshold: float = 1.2) -> bool:
         """
@@ -93,6 +357,37 @@ class FontAnalyzer:
             hierarchy[size] = i + 1
         
         return hierarchy
+    
+    def cluster_font_sizes(self, font_sizes: Iterable[float], tolerance: float = 0.5,
+                           max_levels: int = 3) -> Dict[float, int]:
+        """
+        Cluster font sizes into hierarchy levels in one sorted pass.
+        
+        Distinct sizes are sorted largest first; a size within ``tolerance``
+        points of the largest size of the current cluster joins it,
+        otherwise it starts the next cluster. Clusters beyond
+        ``max_levels`` share the last level. Runs in O(n log n) for n
+        distinct sizes.
+        
+        Args:
+            font_sizes: Font sizes of the heading candidates
+            tolerance: Maximum size difference within one cluster
+            max_levels: Number of hierarchy levels
+            
+        Returns:
+            Dictionary mapping every distinct size to its level (1=largest)
+        """
+        levels = {}
+        level = 0
+        cluster_top = None
+        
+        for size in sorted(set(font_sizes), reverse=True):
+            if cluster_top is None or cluster_top - size > tolerance:
+                cluster_top = size
+                level = min(level + 1, max_levels)
+            levels[size] = level
+        
+        return levels
 
 
 class TextProcessor:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Adobe India Hackathon 2025 - Challenge 1A
+Outline server tests - Endpoints, admission limit and crash recovery on localhost
+
+Usage: python -m pytest -q test_outline_server.py
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import sys
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'src'))
+
+from outline_server import OutlineServer
+from pdf_processor import PDFProcessor
+
+SAMPLE_PDF = Path(__file__).resolve().parent / 'input' / 'file03.pdf'
+
+
+async def _request(port: int, method: str, path: str, body: bytes = b'',
+                   headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], Any]:
+    """Send one HTTP request to the local server and return (status, headers, JSON body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    head = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1"]
+    if method == 'POST':
+        head.append(f"Content-Length: {len(body)}")
+    head.extend(f"{key}: {value}" for key, value in (headers or {}).items())
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode('latin-1').split("\r\n")
+    response_headers = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, json.loads(payload)
+
+
+def _run_with_server(scenario, **options) -> None:
+    """Start a server on a free localhost port, run ``scenario(server)``, then stop it."""
+    async def main():
+        server = OutlineServer('127.0.0.1', 0, **options)
+        await server.start()
+        try:
+            await scenario(server)
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+
+
+def test_endpoints():
+    """/health, /metrics and /outline answer as documented; unknown routes are rejected."""
+    data = SAMPLE_PDF.read_bytes()
+    expected = PDFProcessor().extract_outline_from_bytes(data, 'file03.pdf')
+
+    async def scenario(server):
+        status, _, body = await _request(server.port, 'GET', '/health')
+        assert (status, body) == (200, {'status': 'ok'})
+
+        status, _, body = await _request(server.port, 'POST', '/outline?name=file03.pdf', data)
+        assert status == 200
+        assert body == expected
+
+        status, _, body = await _request(server.port, 'POST', '/outline?pages=2-1', data)
+        assert status == 400
+        status, _, body = await _request(server.port, 'POST', '/outline?stride=0', data)
+        assert status == 400
+
+        status, _, _ = await _request(server.port, 'GET', '/outline')
+        assert status == 405
+        status, _, _ = await _request(server.port, 'GET', '/nope')
+        assert status == 404
+
+        status, _, body = await _request(server.port, 'GET', '/metrics')
+        assert status == 200
+        assert body['requests'] == 1 and body['errors'] == 0
+        assert body['latency_ms']['count'] == 1
+
+    _run_with_server(scenario, workers=1)
+
+
+def test_warm_up_starts_every_worker():
+    """Every worker process is started (and initialized) before the server listens."""
+    async def scenario(server):
+        workers = [child for child in multiprocessing.active_children() if child.is_alive()]
+        assert len(workers) == 2
+
+    _run_with_server(scenario, workers=2)
+
+
+def test_admission_limit():
+    """Uploads beyond workers + queue_size are rejected with 503 and Retry-After."""
+    async def scenario(server):
+        # Announce an upload but hold its body back, keeping it in flight
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(b"POST /outline HTTP/1.1\r\nContent-Length: 10\r\n\r\n")
+        await writer.drain()
+        for _ in range(100):
+            if server.metrics.in_flight == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert server.metrics.in_flight == 1
+
+        status, headers, body = await _request(server.port, 'POST', '/outline', b'%PDF')
+        assert status == 503
+        assert headers.get('Retry-After') == '1'
+
+        status, _, body = await _request(server.port, 'GET', '/metrics')
+        assert body['rejected'] == 1 and body['in_flight'] == 1
+        writer.close()
+
+    _run_with_server(scenario, workers=1, queue_size=0)
+
+
+def test_crash_recovery():
+    """A dead worker breaks the pool once; the pool is rebuilt and requests keep working."""
+    data = SAMPLE_PDF.read_bytes()
+
+    async def scenario(server):
+        for child in multiprocessing.active_children():
+            os.kill(child.pid, signal.SIGKILL)
+        await asyncio.sleep(0.2)
+
+        status, _, body = await _request(server.port, 'POST', '/outline?name=file03.pdf', data)
+        assert status == 200
+        assert body['outline']
+
+        status, _, body = await _request(server.port, 'GET', '/metrics')
+        assert body['pool_restarts'] == 1
+        assert body['errors'] == 0
+
+    _run_with_server(scenario, workers=1)
@@ -1,6 +1,9 @@
+import argparse
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from utils.parser import extract_text_from_pdf
+from utils.page_store import get_default_store
 
 def load_json_config(config_path):
     """Load JSON configuration from a file."""
@@ -16,9 +19,8 @@ def get_pdf_file_path(collection_dir, pdf_filename):
     return os.path.join(collection_dir, "PDFs", pdf_filename)
 
 def extract_sample_pages(pdf_path, num_pages=3):
-    """Extract text from the first few pages of a PDF."""
-    all_pages = extract_text_from_pdf(pdf_path)
-    return all_pages[:num_pages]
+    """Extract text from the first few non-empty pages of a PDF."""
+    return extract_text_from_pdf(pdf_path, max_pages=num_pages)
 
 def append_metadata(metadata, document_name):
     """Append document name to metadata."""
@@ -41,17 +43,37 @@ def add_subsection_analysis(analysis, doc_name, text, page_num):
         "page_number": page_num
     })
 
-def process_single_document(doc_config, collection_dir, output_data):
-    """Process a single document and update output data."""
+def load_document_pages(pdf_path, document_key=None):
+    """Extract the sample pages of a PDF, or None if it does not exist.
+
+    document_key is the PDF's page store key as computed by the parent
+    process, so worker processes do not work it out again.
+    """
+    if not os.path.exists(pdf_path):
+        return None
+    if document_key is not None:
+        get_default_store().remember_key(pdf_path, document_key)
+    sample_pages = extract_sample_pages(pdf_path)
+    # Pool workers exit without running atexit handlers
+    get_default_store().flush()
+    return sample_pages
+
+def process_single_document(doc_config, collection_dir, output_data, sample_pages=None):
+    """Process a single document and update output data.
+
+    If sample_pages is given (e.g. extracted by a worker process), the PDF
+    is not read again.
+    """
     pdf_filename = doc_config["filename"]
     section_title = doc_config["title"]
     pdf_path = get_pdf_file_path(collection_dir, pdf_filename)
 
-    if not os.path.exists(pdf_path):
+    if sample_pages is None:
+        sample_pages = load_document_pages(pdf_path)
+    if sample_pages is None:
         print(colored_terminal_text(f"File not found: {pdf_path}", "31"))
         return
 
-    sample_pages = extract_sample_pages(pdf_path)
     append_metadata(output_data["metadata"], pdf_filename)
 
     for idx, page in enumerate(sample_pages):
@@ -69,8 +91,12 @@ def process_single_document(doc_config, collection_dir, output_data):
             page["page_number"]
         )
 
-def process_collection_documents(config, collection_dir):
-    """Process all documents in a collection."""
+def process_collection_documents(config, collection_dir, document_pages=None):
+    """Process all documents in a collection.
+
+    document_pages optionally holds the already extracted sample pages of
+    each document, in config["documents"] order.
+    """
     output_json_path = os.path.join(collection_dir, "challenge1b_output.json")
     output_data = {
         "metadata": {
@@ -82,28 +108,90 @@ def process_collection_documents(config, collection_dir):
         "subsection_analysis": []
     }
 
-    for document in config["documents"]:
-        process_single_document(document, collection_dir, output_data)
+    for index, document in enumerate(config["documents"]):
+        sample_pages = document_pages[index] if document_pages is not None else None
+        process_single_document(document, collection_dir, output_data, sample_pages)
 
     with open(output_json_path, "w", encoding="utf-8") as file:
         json.dump(output_data, file, indent=2)
 
     print(colored_terminal_text(f"Output written to {output_json_path}", "32"))
 
-def process_all_collections(collection_names):
-    """Process all collections listed."""
+def load_collections(collection_names):
+    """Load the input config of every collection that has one."""
+    collections = []
     for collection_name in collection_names:
         input_json_path = os.path.join(collection_name, "challenge1b_input.json")
         if os.path.exists(input_json_path):
-            print(colored_terminal_text(f"\nProcessing {collection_name}", "34"))
-            config = load_json_config(input_json_path)
-            process_collection_documents(config, collection_name)
+            collections.append((collection_name, load_json_config(input_json_path)))
         else:
             print(colored_terminal_text(f"Skipping {collection_name}: No input JSON found.", "33"))
+    return collections
+
+def extract_all_document_pages(collections, workers):
+    """Extract the sample pages of all documents of all collections on one pool.
+
+    Each unique PDF is extracted once, however many collections reference
+    it (see PageStore.document_key). Documents are scheduled largest file first
+    across collections; the result holds one list per collection in
+    config["documents"] order.
+    """
+    store = get_default_store()
+    tasks = {}  # document key -> [size, pdf_path, [(collection_index, document_index)]]
+    # Missing files are keyed by path and passed to the workers without a key
+    for collection_index, (collection_name, config) in enumerate(collections):
+        for document_index, document in enumerate(config["documents"]):
+            pdf_path = get_pdf_file_path(collection_name, document["filename"])
+            if os.path.exists(pdf_path):
+                key = store.document_key(pdf_path)
+                size = os.path.getsize(pdf_path)
+            else:
+                key, size = ("missing", pdf_path), 0
+            task = tasks.setdefault(key, [size, pdf_path, []])
+            task[2].append((collection_index, document_index))
+
+    document_pages = [[None] * len(config["documents"]) for _, config in collections]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(references, pool.submit(load_document_pages, pdf_path,
+                                            key if isinstance(key, str) else None))
+                   for key, (_, pdf_path, references) in sorted(tasks.items(),
+                                                                key=lambda item: item[1][0],
+                                                                reverse=True)]
+        for references, future in futures:
+            pages = future.result()
+            for collection_index, document_index in references:
+                document_pages[collection_index][document_index] = pages
+    return document_pages
+
+def process_all_collections(collection_names, workers=1):
+    """Process all collections listed.
+
+    With more than one worker, documents from all collections share one
+    process pool and each output is reassembled in document order.
+    """
+    collections = load_collections(collection_names)
+
+    if workers > 1:
+        all_pages = extract_all_document_pages(collections, workers)
+    else:
+        all_pages = [None] * len(collections)
+
+    for (collection_name, config), document_pages in zip(collections, all_pages):
+        print(colored_terminal_text(f"\nProcessing {collection_name}", "34"))
+        process_collection_documents(config, collection_name, document_pages)
 
 def main():
-    collections = ["Collection 1", "Collection 2", "Collection 3"]
-    process_all_collections(collections)
+    parser = argparse.ArgumentParser(description="Process Challenge 1B collections")
+    parser.add_argument("collections", nargs="*",
+                        default=["Collection 1", "Collection 2", "Collection 3"],
+                        help="Collection directories (default: Collection 1-3)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes shared by all collections, 0 = one per CPU core, "
+                             "1 = serial (default: 1)")
+    args = parser.parse_args()
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    process_all_collections(args.collections, workers)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
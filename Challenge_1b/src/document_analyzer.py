@@ -3,17 +3,32 @@ Document Analyzer for Challenge 1B - Persona-Driven Document Intelligence
 Handles PDF text extraction and basic document structure analysis.
 """
 
-import fitz  # PyMuPDF
 import re
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
+from utils.page_store import get_default_store
+
+
+# Header patterns, tried in order on each stripped line
+HEADER_PATTERNS = [
+    re.compile(r'^([A-Z][A-Z\s]{5,40})$', re.MULTILINE),  # ALL CAPS headers
+    re.compile(r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)', re.MULTILINE),  # Numbered headers
+    re.compile(r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):', re.MULTILINE),  # Title Case with colon
+    re.compile(r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)', re.MULTILINE),  # Chapter/Section titles
+]
+LIST_ITEM_PATTERN = re.compile(r'^(?:[\•\-\*]|\d+[\.\)])\s+.+')
+UPPERCASE_START_PATTERN = re.compile(r'^[A-Z]')
+# Lines that end the content of a header section
+SECTION_BREAK_PATTERN = re.compile(r'^(?:[A-Z][A-Z\s]{5,}$|\d+\.?\s+[A-Z])')
 
 
 class DocumentAnalyzer:
     """Analyzes PDF documents and extracts structured content"""
     
-    def __init__(self):
+    def __init__(self, page_store=None):
+        # Parsed pages are shared with the other 1B stages through the store
+        self.page_store = page_store if page_store is not None else get_default_store()
         self.min_section_length = 30
         self.max_section_length = 2000
         self.max_sections = 50
@@ -30,9 +45,8 @@ class DocumentAnalyzer:
             Dictionary containing document analysis results
         """
         try:
-            doc = fitz.open(file_path)
-            full_text, page_contents = self._extract_pdf_content(doc)
-            doc.close()
+            page_texts = self.page_store.get_pages(file_path)
+            full_text, page_contents = self._extract_pdf_content(page_texts)
             
             sections = self._detect_sections(full_text, Path(file_path).name, page_contents)
             metadata = self._generate_metadata(file_path, page_contents, full_text, sections)
@@ -47,14 +61,12 @@ class DocumentAnalyzer:
         except Exception as e:
             return self._create_error_response(file_path, e)
     
-    def _extract_pdf_content(self, doc) -> Tuple[str, List[Dict]]:
-        """Extract text content from PDF document."""
+    def _extract_pdf_content(self, page_texts: List[str]) -> Tuple[str, List[Dict]]:
+        """Build the full text and page records from the parsed page texts."""
         full_text = ""
         page_contents = []
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
+        for page_num, page_text in enumerate(page_texts):
             full_text += page_text + "\n"
             
             page_contents.append({
@@ -88,14 +100,16 @@ class DocumentAnalyzer:
     
     def _detect_sections(self, text: str, filename: str, pages: List[Dict]) -> List[Dict[str, Any]]:
         """Detect logical sections within the document text."""
-        sections = []
+        header_sections = []
+        paragraph_sections = []
+        list_sections = []
         
-        # Apply different detection strategies
-        sections.extend(self._detect_by_headers(text, pages))
-        sections.extend(self._detect_by_paragraphs(text, pages))
-        sections.extend(self._detect_by_lines(text, pages))
+        # One scan per page feeds all three detection strategies
+        for page_info in pages:
+            self._scan_page(page_info, header_sections, paragraph_sections, list_sections)
         
         # Process and deduplicate sections
+        sections = header_sections + paragraph_sections + list_sections
         return self._process_detected_sections(sections, filename)
     
     def _process_detected_sections(self, sections: List[Dict], filename: str) -> List[Dict[str, Any]]:
@@ -103,10 +117,12 @@ class DocumentAnalyzer:
         unique_sections = []
         seen_titles = set()
         
-        for i, section in enumerate(sections):
+        for section in sections:
             if self._is_valid_section(section, seen_titles):
+                # Numbered after filtering, so ids do not shift when a
+                # rejected candidate appears or disappears upstream
                 section.update({
-                    "section_id": f"{filename}_section_{i+1}",
+                    "section_id": f"{filename}_section_{len(unique_sections) + 1}",
                     "word_count": len(section.get("content", "").split()),
                     "confidence_score": self._calculate_confidence(section)
                 })
@@ -120,63 +136,56 @@ class DocumentAnalyzer:
         title = section.get("section_title", "")
         return title and title not in seen_titles and len(title) > 3
     
-    def _detect_by_headers(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect heading-style sections."""
-        sections = []
-        patterns = self._get_header_patterns()
-        
-        for page_info in pages:
-            page_sections = self._find_headers_in_page(page_info, patterns)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _get_header_patterns(self) -> List[str]:
-        """Get regex patterns for header detection."""
-        return [
-            r'^([A-Z][A-Z\s]{5,40})$',  # ALL CAPS headers
-            r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)',  # Numbered headers
-            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',  # Title Case with colon
-            r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)',  # Chapter/Section titles
-        ]
-    
-    def _find_headers_in_page(self, page_info: Dict, patterns: List[str]) -> List[Dict[str, Any]]:
-        """Find headers in a single page."""
-        sections = []
+    def _scan_page(self, page_info: Dict, header_sections: List[Dict], paragraph_sections: List[Dict],
+                   list_sections: List[Dict]) -> None:
+        """Classify each line of a page once and emit header, paragraph and list sections."""
         page_num = page_info["page_number"]
         page_text = page_info["text"]
-        lines = page_text.split('\n')
+        raw_lines = page_text.split('\n')
+        lines = [line.strip() for line in raw_lines]
+        list_items = [bool(LIST_ITEM_PATTERN.match(line)) for line in lines]
+        paragraph_lines = []
         
-        for line in lines:
-            line = line.strip()
-            if not self._is_valid_line(line):
+        for i, line in enumerate(lines):
+            # An empty line is a '\n\n' paragraph break
+            if not raw_lines[i]:
+                self._add_paragraph_section(paragraph_lines, page_num, paragraph_sections)
+                paragraph_lines = []
                 continue
+            paragraph_lines.append(raw_lines[i])
             
-            header_match = self._match_header_patterns(line, patterns)
-            if header_match:
-                section = self._create_header_section(header_match, page_text, page_num)
+            if self._is_valid_line(line):
+                header_match = self._match_header_patterns(line)
+                if header_match:
+                    section = self._create_header_section(header_match, lines, i, page_num)
+                    if section:
+                        header_sections.append(section)
+            
+            if list_items[i]:
+                section = self._create_list_section(lines, list_items, i, page_num)
                 if section:
-                    sections.append(section)
+                    list_sections.append(section)
         
-        return sections
+        self._add_paragraph_section(paragraph_lines, page_num, paragraph_sections)
     
     def _is_valid_line(self, line: str) -> bool:
         """Check if a line is valid for header detection."""
         return bool(line and len(line) >= 5)
     
-    def _match_header_patterns(self, line: str, patterns: List[str]) -> str:
+    def _match_header_patterns(self, line: str) -> str:
         """Try to match line against header patterns."""
-        for pattern in patterns:
-            match = re.search(pattern, line, re.MULTILINE)
+        for pattern in HEADER_PATTERNS:
+            match = pattern.search(line)
             if match:
                 title = match.group(1).strip().rstrip(':')
                 if 5 < len(title) < 80:
                     return title
         return None
     
-    def _create_header_section(self, title: str, page_text: str, page_num: int) -> Dict[str, Any]:
+    def _create_header_section(self, title: str, lines: List[str], header_index: int,
+                               page_num: int) -> Dict[str, Any]:
         """Create a section from detected header."""
-        content = self._extract_content_after_header(page_text, title)
+        content = self._extract_content_after_header(lines, header_index, title)
         if content:
             return {
                 "section_title": title,
@@ -186,30 +195,12 @@ class DocumentAnalyzer:
             }
         return None
     
-    def _detect_by_paragraphs(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect paragraph-based sections."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_paragraph_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_paragraph_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract sections from paragraphs in a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        
-        paragraphs = [p.strip() for p in page_text.split('\n\n') if p.strip()]
-        
-        for paragraph in paragraphs:
-            if self._is_valid_paragraph_length(paragraph):
-                section = self._create_paragraph_section(paragraph, page_num)
-                sections.append(section)
-        
-        return sections
+    def _add_paragraph_section(self, paragraph_lines: List[str], page_num: int,
+                               paragraph_sections: List[Dict]) -> None:
+        """Emit the paragraph made of the given lines if its length is valid."""
+        paragraph = '\n'.join(paragraph_lines).strip()
+        if paragraph and self._is_valid_paragraph_length(paragraph):
+            paragraph_sections.append(self._create_paragraph_section(paragraph, page_num))
     
     def _is_valid_paragraph_length(self, paragraph: str) -> bool:
         """Check if paragraph length is within valid range."""
@@ -231,41 +222,12 @@ class DocumentAnalyzer:
         first_sentence = sentences[0]
         return first_sentence[:50] + "..." if len(first_sentence) > 50 else first_sentence
     
-    def _detect_by_lines(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect line-based structured content."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_list_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_list_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract list-based sections from a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        lines = page_text.split('\n')
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if self._is_list_item(line):
-                section = self._create_list_section(lines, i, page_num)
-                if section:
-                    sections.append(section)
-        
-        return sections
-    
-    def _is_list_item(self, line: str) -> bool:
-        """Check if line is a list item."""
-        return bool(re.match(r'^[\•\-\*]\s+.+', line) or re.match(r'^\d+[\.\)]\s+.+', line))
-    
-    def _create_list_section(self, lines: List[str], start_index: int, page_num: int) -> Dict[str, Any]:
+    def _create_list_section(self, lines: List[str], list_items: List[bool], start_index: int,
+                             page_num: int) -> Dict[str, Any]:
         """Create a section from list items."""
-        line = lines[start_index].strip()
+        line = lines[start_index]
         title = line[:50] + "..." if len(line) > 50 else line
-        content = self._gather_list_content(lines, start_index)
+        content = self._gather_list_content(lines, list_items, start_index)
         
         if len(content) > self.min_section_length:
             return {
@@ -276,62 +238,54 @@ class DocumentAnalyzer:
             }
         return None
     
-    def _gather_list_content(self, lines: List[str], start_index: int) -> str:
+    def _gather_list_content(self, lines: List[str], list_items: List[bool], start_index: int) -> str:
         """Gather related list content starting from given index."""
-        content = lines[start_index].strip()
+        content = lines[start_index]
         
         for j in range(start_index + 1, min(len(lines), start_index + self.max_lookahead_lines + 1)):
-            next_line = lines[j].strip()
+            next_line = lines[j]
             if not next_line:
                 continue
             
-            if self._is_continuation_line(next_line):
-                content += "\n" + next_line if self._is_list_item(next_line) else " " + next_line
+            # Further list items and lines not starting a new sentence continue the list
+            if list_items[j]:
+                content += "\n" + next_line
+            elif not UPPERCASE_START_PATTERN.match(next_line):
+                content += " " + next_line
             else:
                 break
         
         return content
     
-    def _is_continuation_line(self, line: str) -> bool:
-        """Check if line continues the current list section."""
-        return (self._is_list_item(line) or 
-                (line and not re.match(r'^[A-Z]', line)))
-    
-    def _extract_content_after_header(self, page_text: str, header_line: str) -> str:
-        """Extract content that follows a detected header."""
-        lines = page_text.split('\n')
+    def _extract_content_after_header(self, lines: List[str], header_index: int, header_line: str) -> str:
+        """Extract content that follows the header at lines[header_index]."""
+        header_line = header_line.strip()
         content_lines = []
-        found_header = False
+        content_length = 0  # len(' '.join(content_lines))
         
-        for line in lines:
-            if self._is_header_line(line, header_line):
-                found_header = True
+        for line in lines[header_index + 1:]:
+            # Skip repetitions of the header
+            if header_line in line:
                 continue
             
-            if found_header:
-                if self._should_stop_content_extraction(line, content_lines):
-                    break
-                content_lines.append(line.strip())
+            if self._should_stop_content_extraction(line, content_length):
+                break
+            content_length += len(line) + (1 if content_lines else 0)
+            content_lines.append(line)
         
         return ' '.join(content_lines)
     
-    def _is_header_line(self, line: str, header_line: str) -> bool:
-        """Check if current line matches the header."""
-        return header_line.strip() in line.strip()
-    
-    def _should_stop_content_extraction(self, line: str, content_lines: List[str]) -> bool:
+    def _should_stop_content_extraction(self, line: str, content_length: int) -> bool:
         """Determine if content extraction should stop."""
-        line = line.strip()
         if not line:
             return False
         
         # Stop if we hit another header
-        if (re.match(r'^[A-Z][A-Z\s]{5,}$', line) or 
-            re.match(r'^\d+\.?\s+[A-Z]', line)):
+        if SECTION_BREAK_PATTERN.match(line):
             return True
         
         # Stop if content is too long
-        return len(' '.join(content_lines)) > self.max_section_length
+        return content_length > self.max_section_length
     
     def _calculate_confidence(self, section: Dict[str, Any]) -> float:
         """Calculate confidence score for a detected section."""
@@ -0,0 +1,244 @@
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+
+class PageStore:
+    """
+    Store of parsed page text, shared by all 1B stages.
+
+    Documents are keyed by file identity (path, size, modification time),
+    which costs a stat call. Only when two files have the same size are
+    their contents hashed, so the same PDF referenced from several
+    collections (or under another name) is still parsed once. Pages are
+    parsed on demand and cached individually: a reader that needs three
+    pages only pays for three, and a later full read reuses them. The most
+    recently used documents are kept in memory, up to max_bytes of page
+    text; with a spill_dir, evicted documents are written to disk as JSON
+    and reloaded on the next miss, so parsed pages also survive across
+    runs. The spill directory is capped at max_spill_bytes: after each
+    write, the least recently used spill files are deleted.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, spill_dir=None,
+                 max_spill_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()  # document key -> {"page_count", "texts", "size"}
+        self._size = 0  # UTF-8 bytes of page text held in memory
+        self._keys = {}  # (path, mtime_ns, size) -> document key
+        self._hashes = {}  # (path, mtime_ns, size) -> content hash, for same-size files
+        self._dirty = set()  # document keys with pages not yet spilled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_id(pdf_path):
+        stat = os.stat(pdf_path)
+        return (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+
+    def _content_hash(self, file_id):
+        content_hash = self._hashes.get(file_id)
+        if content_hash is None:
+            digest = hashlib.sha256()
+            with open(file_id[0], "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            content_hash = self._hashes[file_id] = digest.hexdigest()
+        return content_hash
+
+    def document_key(self, pdf_path):
+        """
+        Return the key of a PDF in the store.
+
+        A new file shares the key of a known file with identical content;
+        contents are only hashed when a known file has the same size.
+        """
+        file_id = self._file_id(pdf_path)
+        key = self._keys.get(file_id)
+        if key is not None:
+            return key
+
+        for known_id, known_key in list(self._keys.items()):
+            if (known_id[2] == file_id[2] and known_id[0] != file_id[0]
+                    and self._content_hash(known_id) == self._content_hash(file_id)):
+                key = known_key
+                break
+        else:
+            key = hashlib.sha256("\0".join(map(str, file_id)).encode("utf-8")).hexdigest()
+
+        self._keys[file_id] = key
+        return key
+
+    def remember_key(self, pdf_path, key):
+        """Use a key computed elsewhere (e.g. by a parent process) for a PDF."""
+        self._keys[self._file_id(pdf_path)] = key
+
+    def iter_pages(self, pdf_path, pages=None):
+        """
+        Lazily yields (page_number, text) for the requested pages.
+
+        - pages: optional iterable of 1-based page numbers, in order
+          (out-of-range numbers are skipped); defaults to every page
+
+        Cached pages are served from the store; the PDF is only opened if
+        a requested page has not been parsed yet.
+        """
+        key = self.document_key(pdf_path)
+        entry = self._get_entry(key)
+        doc = None
+        try:
+            if entry is None:
+                doc = fitz.open(pdf_path)
+                entry = {"page_count": len(doc), "texts": {}, "size": 0}
+                self._put_entry(key, entry)
+
+            page_count = entry["page_count"]
+            texts = entry["texts"]
+            page_numbers = range(1, page_count + 1) if pages is None else pages
+
+            for page_number in page_numbers:
+                if not 1 <= page_number <= page_count:
+                    continue
+                text = texts.get(page_number)
+                if text is None:
+                    self.misses += 1
+                    if doc is None:
+                        doc = fitz.open(pdf_path)
+                    text = texts[page_number] = doc.load_page(page_number - 1).get_text()
+                    self._dirty.add(key)
+                    self._grow_entry(key, entry, len(text.encode("utf-8")))
+                else:
+                    self.hits += 1
+                yield page_number, text
+        finally:
+            if doc is not None:
+                doc.close()
+
+    def get_pages(self, pdf_path):
+        """Return the text of every page of a PDF, in page order."""
+        return [text for _, text in self.iter_pages(pdf_path)]
+
+    def _get_entry(self, key):
+        """Look up a document in memory, then in the spill directory."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        if self.spill_dir:
+            spill_path = self._spill_path(key)
+            try:
+                with open(spill_path, "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                texts = {int(page_number): text for page_number, text in data["texts"].items()}
+                entry = {"page_count": int(data["page_count"]), "texts": texts,
+                         "size": sum(len(text.encode("utf-8")) for text in texts.values())}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                return None
+            try:
+                # Mark the file as recently used for _prune_spill
+                os.utime(spill_path)
+            except OSError:
+                pass
+            self._put_entry(key, entry)
+        return entry
+
+    def _put_entry(self, key, entry):
+        """Insert a document as the most recently used one."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._size += entry["size"]
+        self._evict()
+
+    def _grow_entry(self, key, entry, size):
+        """Account for a newly parsed page of a stored document."""
+        entry["size"] += size
+        if self._entries.get(key) is entry:
+            self._size += size
+            self._evict()
+
+    def _evict(self):
+        """Evict (and spill) least recently used documents beyond max_bytes."""
+        # The most recently used document stays, however large
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self._size -= old_entry["size"]
+            self._spill(old_key, old_entry)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.json")
+
+    def _spill(self, key, entry):
+        """Write a document to the spill directory atomically, if it changed."""
+        if not self.spill_dir or key not in self._dirty:
+            return
+        self._dirty.discard(key)
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"page_count": entry["page_count"], "texts": entry["texts"]}, file)
+            os.replace(tmp_path, self._spill_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._prune_spill(self._spill_path(key))
+
+    def _prune_spill(self, keep_path):
+        """Delete the least recently used spill files beyond max_spill_bytes."""
+        files = []
+        total = 0
+        try:
+            with os.scandir(self.spill_dir) as scan:
+                for item in scan:
+                    if not item.name.endswith(".json"):
+                        continue
+                    stat = item.stat()
+                    total += stat.st_size
+                    if item.path != keep_path:
+                        files.append((stat.st_mtime_ns, stat.st_size, item.path))
+        except OSError:
+            return
+
+        # Oldest first; the file just written always stays
+        for _, size, path in sorted(files):
+            if total <= self.max_spill_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def flush(self):
+        """Spill every changed in-memory document (no-op without a spill_dir)."""
+        for key, entry in self._entries.items():
+            self._spill(key, entry)
+
+
+_default_store = None
+
+def get_default_store():
+    """
+    Return the process-wide page store.
+
+    Set PAGE_STORE_DIR to spill parsed pages to disk; they are written on
+    eviction, on flush() and when the interpreter exits, and reused by
+    later runs. PAGE_STORE_MAX_MB caps the directory (default 1024).
+    """
+    global _default_store
+    if _default_store is None:
+        max_spill_mb = float(os.environ.get("PAGE_STORE_MAX_MB") or 1024)
+        _default_store = PageStore(spill_dir=os.environ.get("PAGE_STORE_DIR") or None,
+                                   max_spill_bytes=int(max_spill_mb * 1024 * 1024))
+        if _default_store.spill_dir:
+            atexit.register(_default_store.flush)
+    return _default_store
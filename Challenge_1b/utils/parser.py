@@ -1,25 +1,41 @@
-import fitz  # PyMuPDF
+from itertools import islice
+from utils.page_store import get_default_store
 
-def extract_text_from_pdf(pdf_path):
+def iter_text_from_pdf(pdf_path, pages=None, store=None):
     """
-    Extracts text from each page of the given PDF.
+    Lazily yields the text of each non-empty page of the given PDF.
 
-    Returns a list of dictionaries containing:
+    Pages are read one at a time through the shared page store, so a
+    caller that stops iterating early never pays for the remaining pages
+    and a PDF seen before (under any name) is not parsed again.
+
+    - pages: optional iterable of 1-based page numbers to read, in order
+      (out-of-range numbers are skipped); defaults to every page
+    - store: PageStore to read through (default: the process-wide store)
+
+    Yields dictionaries containing:
     - page_number (starting from 1)
     - text (full page text)
     """
-    doc = fitz.open(pdf_path)
-    extracted = []
-
-    for page_number in range(len(doc)):
-        page = doc.load_page(page_number)
-        text = page.get_text()
+    store = store if store is not None else get_default_store()
 
+    for page_number, text in store.iter_pages(pdf_path, pages):
         if text.strip():  # Skip empty pages
-            extracted.append({
-                "page_number": page_number + 1,
+            yield {
+                "page_number": page_number,
                 "text": text
-            })
+            }
 
-    doc.close()
-    return extracted
\ No newline at end of file
+def extract_text_from_pdf(pdf_path, max_pages=None, pages=None, store=None):
+    """
+    Extracts text from each page of the given PDF.
+
+    - max_pages: stop after this many non-empty pages
+    - pages: optional iterable of 1-based page numbers to read
+    - store: PageStore to read through (default: the process-wide store)
+
+    Returns a list of dictionaries containing:
+    - page_number (starting from 1)
+    - text (full page text)
+    """
+    return list(islice(iter_text_from_pdf(pdf_path, pages, store), max_pages))